@@ -0,0 +1,97 @@
+import threading
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from task import Task, Cancelled
+
+
+class JobSignals(QObject):
+    # Первый аргумент каждого сигнала — номер задания
+    started = pyqtSignal(int)
+    progress = pyqtSignal(int, int)      # проценты
+    partial = pyqtSignal(int, object)    # порция результата (x, y)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    cancelled = pyqtSignal(int)
+
+
+class Job(QRunnable):
+    def __init__(self, job_id, param, signals):
+        super().__init__()
+        # Объект нужен менеджеру после запуска (отмена, tryTake) — пул не должен его удалять
+        self.setAutoDelete(False)
+        self.job_id = job_id
+        self.param = dict(param)  # снимок: дальнейшие правки в окне на задание не влияют
+        self.signals = signals
+        self.cancel_event = threading.Event()
+        self.percent = -1
+
+    def report(self, fraction):
+        # Сигнал только при смене процента, чтобы не забивать очередь событий GUI
+        percent = int(fraction * 100)
+        if percent != self.percent:
+            self.percent = percent
+            self.signals.progress.emit(self.job_id, percent)
+
+    def run(self):
+        if self.cancel_event.is_set():
+            self.signals.cancelled.emit(self.job_id)
+            return
+        self.signals.started.emit(self.job_id)
+        try:
+            result = Task(self.param).solve(
+                progress=self.report,
+                partial=lambda value: self.signals.partial.emit(self.job_id, value),
+                cancelled=self.cancel_event.is_set,
+            )
+        except Cancelled:
+            self.signals.cancelled.emit(self.job_id)
+        except Exception as e:
+            self.signals.failed.emit(self.job_id, str(e))
+        else:
+            self.signals.finished.emit(self.job_id, result)
+
+
+class JobManager(QObject):
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        if max_workers:
+            self.pool.setMaxThreadCount(max_workers)
+        # Общие сигналы создаются в потоке GUI — слоты окна вызываются в нём же
+        self.signals = JobSignals(self)
+        self.signals.finished.connect(self.forget)
+        self.signals.failed.connect(self.forget)
+        self.signals.cancelled.connect(self.forget)
+        self.jobs = {}
+        self.next_id = 1
+
+    def submit(self, param):
+        job = Job(self.next_id, param, self.signals)
+        self.next_id += 1
+        self.jobs[job.job_id] = job
+        self.pool.start(job)
+        return job.job_id
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        job.cancel_event.set()
+        # Ещё не начатое задание снимаем с очереди сразу, запущенное остановится на ближайшем шаге
+        if self.pool.tryTake(job):
+            self.signals.cancelled.emit(job_id)
+
+    def cancel_all(self):
+        for job_id in list(self.jobs):
+            self.cancel(job_id)
+
+    def forget(self, job_id, *args):
+        self.jobs.pop(job_id, None)
+
+    def active(self):
+        return len(self.jobs)
+
+    def shutdown(self):
+        self.cancel_all()
+        self.pool.waitForDone()
@@ -3,13 +3,46 @@ from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 import pyqtgraph as pg
 
-from task import Task, load_param, save_param
+from task import Task, load_param, save_param, MAX_POINTS, PREVIEW_POINTS, STREAM_BUFFER
+from jobs import JobManager
+from ring_buffer import RingBuffer
+
+PREVIEW_DEBOUNCE_MS = 16  # пауза перед перерисовкой предпросмотра (~один кадр при 60 fps)
+STREAM_REDRAW_MS = 33     # порции результата перерисовываются не чаще ~30 раз в секунду
+QUEUE_COLUMNS = ["№", "a", "b", "Статус", "Прогресс"]
 
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.param = load_param('param.json')
+        self.param.setdefault('points', PREVIEW_POINTS)
+
+        # Быстрые изменения спинбоксов сливаются: пересчёт только по последнему значению
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(PREVIEW_DEBOUNCE_MS)
+        self.preview_timer.timeout.connect(self.plot_up)
+
+        # Расчёты идут в пуле потоков: кнопка запуска не блокируется, задания встают в очередь
+        self.jobs = JobManager(self.param.get('workers'), self)
+        self.jobs.signals.started.connect(self.calc_started)
+        self.jobs.signals.progress.connect(self.calc_progress)
+        self.jobs.signals.partial.connect(self.calc_partial)
+        self.jobs.signals.finished.connect(self.calc_finished)
+        self.jobs.signals.failed.connect(self.calc_failed)
+        self.jobs.signals.cancelled.connect(self.calc_cancelled)
+        self.job_rows = {}
+
+        # На графике потоково показывается последний запущенный расчёт
+        # Буфер создаётся на каждый расчёт по числу его точек (run_calc)
+        self.stream_job = None
+        self.stream = None
+        self.stream_timer = QTimer(self)
+        self.stream_timer.setSingleShot(True)
+        self.stream_timer.setInterval(STREAM_REDRAW_MS)
+        self.stream_timer.timeout.connect(self.stream_redraw)
+
         self.ustan_ui()
         
     def ustan_ui(self):
@@ -55,6 +88,19 @@ class MainWindow(QMainWindow):
         b_position.addWidget(self.b_label)
         b_position.addWidget(self.b_spin)
 
+
+        # Разрешение предпросмотра
+        points_group = QGroupBox("Точек на графике")
+        points_position = QVBoxLayout(points_group)
+
+        self.points_spin = QSpinBox()
+        self.points_spin.setRange(100, MAX_POINTS)
+        self.points_spin.setSingleStep(10000)
+        self.points_spin.setValue(int(self.param['points']))
+        self.points_spin.valueChanged.connect(self.change_points)
+
+        points_position.addWidget(self.points_spin)
+
         
         # Кнопки
         self.run_btn = QPushButton("Выполнить расчет")
@@ -62,13 +108,37 @@ class MainWindow(QMainWindow):
         
         self.save_btn = QPushButton("Сохранить параметры")
         self.save_btn.clicked.connect(self.save_param)
+
+        # Очередь расчётов
+        queue_group = QGroupBox("Очередь расчётов")
+        queue_position = QVBoxLayout(queue_group)
+
+        self.queue = QTableWidget(0, len(QUEUE_COLUMNS))
+        self.queue.setHorizontalHeaderLabels(QUEUE_COLUMNS)
+        self.queue.verticalHeader().setVisible(False)
+        self.queue.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.queue.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.queue.horizontalHeader().setStretchLastSection(True)
+
+        self.cancel_btn = QPushButton("Отменить выбранные")
+        self.cancel_btn.clicked.connect(self.cancel_selected)
+        self.cancel_all_btn = QPushButton("Отменить все")
+        self.cancel_all_btn.clicked.connect(self.jobs.cancel_all)
+
+        queue_buttons = QHBoxLayout()
+        queue_buttons.addWidget(self.cancel_btn)
+        queue_buttons.addWidget(self.cancel_all_btn)
+
+        queue_position.addWidget(self.queue)
+        queue_position.addLayout(queue_buttons)
         
         # Добавляем 
         left_position.addWidget(a_group)
         left_position.addWidget(b_group)
+        left_position.addWidget(points_group)
         left_position.addWidget(self.run_btn)
         left_position.addWidget(self.save_btn)
-        left_position.addStretch()
+        left_position.addWidget(queue_group)
         
         # Правая панель - график
         right = QWidget()
@@ -77,6 +147,12 @@ class MainWindow(QMainWindow):
         self.plot = pg.PlotWidget()
         self.plot.setBackground('white')
         self.line = self.plot.plot(pen='green')
+        # Плотные кривые: рисуем только видимую часть, прореживая по пикам
+        self.line.setDownsampling(auto=True, method='peak')
+        self.line.setClipToView(True)
+        self.result_line = self.plot.plot(pen='blue')
+        self.result_line.setDownsampling(auto=True, method='peak')
+        self.result_line.setClipToView(True)
         
         self.result = QLabel("Результат: -")
         
@@ -89,12 +165,16 @@ class MainWindow(QMainWindow):
     def change_a(self, value):
         self.param['a'] = value 
         self.a_label.setText(f"a: {self.param['a']:.1f}")
-        self.plot_up()
+        self.preview_timer.start()
         
     def change_b(self, value):
         self.param['b'] = value 
         self.b_label.setText(f"b: {self.param['b']:.1f}")
-        self.plot_up()
+        self.preview_timer.start()
+
+    def change_points(self, value):
+        self.param['points'] = value
+        self.preview_timer.start()
         
     def plot_up(self):
         # предпросмотр
@@ -103,22 +183,65 @@ class MainWindow(QMainWindow):
         self.line.setData(data['x'], data['y'])
         
     def run_calc(self):
-        self.run_btn.setEnabled(False)
-        self.result.setText("Идёт расчет...")
+        job_id = self.jobs.submit(self.param)
 
-        # Создаем рабочий поток
-        self.worker = Worker(self.param)
-        self.worker.finished.connect(self.calc_finished)
-        self.worker.start()
+        row = self.queue.rowCount()
+        self.queue.insertRow(row)
+        for column, value in enumerate([job_id, f"{self.param['a']:.1f}", f"{self.param['b']:.1f}", "В очереди"]):
+            self.queue.setItem(row, column, QTableWidgetItem(str(value)))
+        bar = QProgressBar()
+        bar.setRange(0, 100)
+        self.queue.setCellWidget(row, 4, bar)
+        self.job_rows[job_id] = row
 
-    def calc_finished(self, result):
-        self.run_btn.setEnabled(True)
-        self.result.setText(f"Результат: {result}")
-        
-        # Обновляем график
-        task = Task(self.param)
-        data = task.get_plot_data()
-        self. line.setData(data['x'], data['y'])
+        self.stream_job = job_id
+        self.stream = RingBuffer(min(int(self.param['points']), STREAM_BUFFER))
+        self.result_line.setData([], [])
+        self.result.setText(f"Расчётов в работе: {self.jobs.active()}")
+
+    def set_status(self, job_id, status):
+        self.queue.item(self.job_rows[job_id], 3).setText(status)
+
+    def cancel_selected(self):
+        for index in self.queue.selectionModel().selectedRows():
+            self.jobs.cancel(int(self.queue.item(index.row(), 0).text()))
+
+    def calc_started(self, job_id):
+        self.set_status(job_id, "Выполняется")
+
+    def calc_progress(self, job_id, percent):
+        self.queue.cellWidget(self.job_rows[job_id], 4).setValue(percent)
+
+    def calc_partial(self, job_id, chunk):
+        if job_id != self.stream_job:
+            return
+        self.stream.append(*chunk)
+        if not self.stream_timer.isActive():
+            self.stream_timer.start()
+
+    def stream_redraw(self):
+        x, y = self.stream.data()
+        self.result_line.setData(x, y)
+
+    def calc_failed(self, job_id, message):
+        self.set_status(job_id, f"Ошибка: {message}")
+
+    def calc_cancelled(self, job_id):
+        self.set_status(job_id, "Отменён")
+
+    def calc_finished(self, job_id, result):
+        self.set_status(job_id, "Готово")
+        self.result.setText(f"Результат №{job_id}: {result}")
+
+        # Досылаем на график порции, пришедшие после последней перерисовки
+        if job_id == self.stream_job:
+            self.stream_timer.stop()
+            self.stream_redraw()
+
+    def closeEvent(self, event):
+        # Не оставляем потоки пула работать после закрытия окна
+        self.jobs.shutdown()
+        super().closeEvent(event)
         
     def save_param(self):
         save_param(self.param, 'param.json')
@@ -132,19 +255,6 @@ class MainWindow(QMainWindow):
         QMessageBox.information(self, "Обновление", "Параметры обновлены!")
 
 
-class Worker(QThread):
-    finished = pyqtSignal(object)
-    
-    def __init__(self, param):
-        super().__init__()
-        self.param = param
-        
-    def run(self):
-        task = Task(self.param)
-        result = task.solve()  
-        self.finished.emit(result)
-
-
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = MainWindow()
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+class RingBuffer:
+    """Последние capacity точек (x, y) кривой, приходящей порциями."""
+
+    def __init__(self, capacity):
+        self.capacity = int(capacity)
+        # Каждая точка пишется дважды (i и i + capacity), поэтому окно
+        # из последних size точек всегда непрерывно и отдаётся без копирования
+        self.x = np.empty(2 * self.capacity)
+        self.y = np.empty(2 * self.capacity)
+        self.start = 0
+        self.size = 0
+
+    def clear(self):
+        self.start = 0
+        self.size = 0
+
+    def append(self, x, y):
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if len(x) > self.capacity:
+            x, y = x[-self.capacity:], y[-self.capacity:]
+        n = len(x)
+        if n == 0:
+            return
+
+        end = (self.start + self.size) % self.capacity
+        index = (end + np.arange(n)) % self.capacity
+        self.x[index] = x
+        self.x[index + self.capacity] = x
+        self.y[index] = y
+        self.y[index + self.capacity] = y
+
+        overflow = max(0, self.size + n - self.capacity)
+        self.start = (self.start + overflow) % self.capacity
+        self.size = min(self.capacity, self.size + n)
+
+    def data(self):
+        stop = self.start + self.size
+        return self.x[self.start:stop], self.y[self.start:stop]
+
+    def __len__(self):
+        return self.size
@@ -1,22 +1,67 @@
 import time
-import math
 import json
+from functools import lru_cache
+
+import numpy as np
+
+X_MAX = 10.0             # предпросмотр строится на [0, X_MAX)
+PREVIEW_POINTS = 100000  # точек по умолчанию
+MAX_POINTS = 1000000     # больше точек спинбокс не даёт
+PREVIEW_CACHE = 32       # сколько кривых (a, b, points) держим в памяти
+SOLVE_TIME = 10.0        # длительность расчёта, с
+SOLVE_STEPS = 100        # шагов расчёта: между ними — прогресс и проверка отмены
+STREAM_BUFFER = MAX_POINTS  # предел точек результата, которые держит график во время расчёта
+
+
+class Cancelled(Exception):
+    pass
+
+
+@lru_cache(maxsize=4)
+def plot_x(points):
+    x = np.linspace(0.0, X_MAX, points, endpoint=False)
+    x.flags.writeable = False
+    return x
+
+
+@lru_cache(maxsize=PREVIEW_CACHE)
+def plot_curve(a, b, points):
+    # Массивы общие для всех обращений к кэшу — только для чтения
+    x = plot_x(points)
+    y = a * np.sin(b * x)
+    y.flags.writeable = False
+    return x, y
 
 
 class Task:
     def __init__(self, param):
         self.param = param
     
-    def solve(self):
-        time.sleep(10)
-        return 0
-    
-    def get_plot_data(self):
-        x = [i / 10 for i in range(100)]
-        a = self.param.get('a', 1)
-        b = self.param.get('b', 1)
+    def solve(self, progress=None, partial=None, cancelled=None):
+        # progress(доля), partial((x, y) — очередная порция кривой), cancelled() -> True, если пора остановиться
+        x, y = self.curve()
+        bounds = np.linspace(0, len(x), SOLVE_STEPS + 1).astype(int)
+        result = 0
+        for step in range(SOLVE_STEPS):
+            if cancelled is not None and cancelled():
+                raise Cancelled()
+            time.sleep(SOLVE_TIME / SOLVE_STEPS)
+            if partial is not None:
+                lo, hi = bounds[step], bounds[step + 1]
+                partial((x[lo:hi], y[lo:hi]))
+            if progress is not None:
+                progress((step + 1) / SOLVE_STEPS)
+        return result
+
+    def curve(self):
+        # Округляем, чтобы 1.2 и 1.2000000000000002 из спинбокса попадали в одну запись кэша
+        a = round(float(self.param.get('a', 1)), 6)
+        b = round(float(self.param.get('b', 1)), 6)
+        points = int(self.param.get('points', PREVIEW_POINTS))
+        return plot_curve(a, b, points)
 
-        y = [a * math.sin(b * xi) for xi in x]
+    def get_plot_data(self):
+        x, y = self.curve()
         return {'x': x, 'y': y}
 
 def load_param(filename):
@@ -26,4 +71,4 @@ def load_param(filename):
 
 def save_param(param, filename):
     with open(filename, 'w') as f:
-        json.dump(param, f, indent=2)
\ No newline at end of file
+        json.dump(param, f, indent=2)
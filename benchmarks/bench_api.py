@@ -0,0 +1,64 @@
+import itertools
+
+import pytest
+
+from data import history_rows
+
+HISTORY_ROWS = [1_000, 10_000, 100_000]
+
+
+@pytest.fixture(scope="module")
+def api(backend):
+    from fastapi.testclient import TestClient
+    with TestClient(backend.app) as client:
+        yield client
+
+
+@pytest.fixture
+def storage_with(backend, monkeypatch):
+    """Подставляет в get_storage SQLite-хранилище с n строками истории."""
+    from app import storage
+
+    def fill(n):
+        store = storage.SqliteStorage(path=f"history-{n}.db", import_csv=None)
+        if store.read(0, 1)[2] != n:
+            store.append(history_rows(n))
+            store.flush()
+        monkeypatch.setattr(storage, "_storage", store)
+        return store
+    return fill
+
+
+@pytest.mark.benchmark(group="backend POST /run")
+@pytest.mark.parametrize("cache", [False, True], ids=["no-cache", "cache-hit"])
+def bench_run(benchmark, api, no_sleep, storage_with, monkeypatch, cache):
+    # Расчёт без паузы в Task.calculate: меряем очередь задач, кэш, запись и сериализацию.
+    # Заглушка решателя случайна и кэш обходит — для замера кэша считаем её детерминированной
+    from app import task
+    no_sleep(task)
+    monkeypatch.setattr(task.Task, "deterministic", cache)
+    storage_with(0)
+    points = itertools.count()
+
+    def run():
+        a1 = 1.0 if cache else float(next(points))
+        response = api.post("/run", params={"cache": str(cache).lower()}, json={"a1": a1, "b1": 2.0})
+        assert response.status_code == 200
+
+    benchmark(run)
+
+
+@pytest.mark.benchmark(group="backend GET /history")
+@pytest.mark.parametrize("rows", HISTORY_ROWS)
+def bench_history_full(benchmark, api, storage_with, rows):
+    storage_with(rows)
+    benchmark(lambda: api.get("/history").json())
+
+
+@pytest.mark.benchmark(group="backend GET /history, страница и 304")
+@pytest.mark.parametrize("mode", ["page", "not-modified"])
+def bench_history_incremental(benchmark, api, storage_with, mode):
+    storage_with(HISTORY_ROWS[-1])
+    tag = api.get("/history", params={"cursor": 0, "limit": 100}).headers["etag"]
+    headers = {"If-None-Match": tag} if mode == "not-modified" else {}
+    benchmark(lambda: api.get("/history", params={"cursor": 0, "limit": 100}, headers=headers))
@@ -0,0 +1,51 @@
+import itertools
+
+import pytest
+
+from data import series_frame
+
+SIZES = [1_000, 10_000, 100_000]
+_folders = itertools.count()
+
+
+def new_folder(prefix):
+    return f"{prefix}-{next(_folders):06d}"
+
+
+@pytest.mark.benchmark(group="dash Task.solve, серия")
+@pytest.mark.parametrize("shared", [False, True], ids=["own-files", "shared-writer"])
+def bench_task_solve_series(benchmark, workdir, no_sleep, shared):
+    # own-files — серия сама открывает events.jsonl и results.csv (одиночный запуск),
+    # shared-writer — общий журнал и writer запуска, как в run_series
+    import task
+    from event_log import EventLog, events_path
+    from results_writer import ResultsWriter
+    no_sleep(task)
+
+    folder = new_folder("series")
+    params = series_frame(1).iloc[0].to_dict()
+    if not shared:
+        benchmark(lambda: task.Task(params, folder, 0).solve())
+        return
+
+    with EventLog(events_path(folder)) as events, \
+            ResultsWriter(f"runs/{folder}/results.csv", task.RESULT_COLUMNS, batch_size=1000) as writer:
+        benchmark(lambda: task.Task(params, folder, 0, writer, events).solve())
+
+
+@pytest.mark.benchmark(group="dash BatchTask.solve")
+@pytest.mark.parametrize("rows", SIZES)
+def bench_batch_solve(benchmark, workdir, rows):
+    from task import BatchTask
+    params = series_frame(rows)
+    # Каждый раунд — новый каталог запуска, чтобы results.csv не рос от раунда к раунду
+    benchmark.pedantic(lambda folder: BatchTask(params, folder).solve(),
+                       setup=lambda: ((new_folder("batch"),), {}), rounds=5)
+
+
+@pytest.mark.benchmark(group="dash BatchTask.compute")
+@pytest.mark.parametrize("rows", SIZES)
+def bench_batch_compute(benchmark, workdir, rows):
+    from task import BatchTask
+    batch = BatchTask(series_frame(rows), new_folder("compute"))
+    benchmark(batch.compute)
@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from data import make_runs
+
+RUNS = [10, 1_000, 10_000]
+ROWS_PER_RUN = 20
+
+
+@pytest.fixture(scope="module")
+def history_dirs(workdir, tmp_path_factory):
+    """Для каждого размера — один набор runs/ и два сценария: только CSV (csv) и загруженный в Parquet (store)."""
+    import history_store
+    dirs = {}
+    old = os.getcwd()
+    for runs in RUNS:
+        shared = tmp_path_factory.mktemp(f"runs-{runs}")
+        make_runs(str(shared), runs, ROWS_PER_RUN, finished=True)
+        for source in ("csv", "store"):
+            path = tmp_path_factory.mktemp(f"history-{source}-{runs}")
+            os.symlink(shared, os.path.join(path, "runs"))
+            if source == "store":
+                os.chdir(path)
+                history_store.ingest_pending("runs")
+            dirs[source, runs] = path
+    os.chdir(old)
+    return dirs
+
+
+@pytest.fixture
+def history_at(dash_app, history_dirs, monkeypatch):
+    """Переключает dash/app.py на каталог с историей нужного размера; возвращает сброс кэшей."""
+    import history_store
+    from history_cache import HistoryCache
+
+    def switch(source, runs):
+        # STORE_DIR и runs/ задаются относительными путями — переходим в каталог сценария
+        monkeypatch.chdir(history_dirs[source, runs])
+        monkeypatch.setattr(dash_app, "history_cache", HistoryCache(dash_app.BASE_DIR))
+
+        def reset():
+            dash_app.history_cache = HistoryCache(dash_app.BASE_DIR)
+            history_store._dataset = None
+        return reset
+    return switch
+
+
+@pytest.mark.benchmark(group="dash load_history_df, холодный кэш")
+@pytest.mark.parametrize("source", ["csv", "store"])
+@pytest.mark.parametrize("runs", RUNS)
+def bench_load_history_cold(benchmark, dash_app, history_at, source, runs):
+    reset = history_at(source, runs)
+    rounds = 3 if runs >= 10_000 else 5
+    df = benchmark.pedantic(dash_app.load_history_df, setup=reset, rounds=rounds)
+    assert len(df) == runs * ROWS_PER_RUN
+
+
+@pytest.mark.benchmark(group="dash load_history_df, тёплый кэш")
+@pytest.mark.parametrize("source", ["csv", "store"])
+@pytest.mark.parametrize("runs", RUNS)
+def bench_load_history_warm(benchmark, dash_app, history_at, source, runs):
+    history_at(source, runs)()
+    dash_app.load_history_df()
+    benchmark(dash_app.load_history_df)
+
+
+@pytest.mark.benchmark(group="dash load_history_df, фильтр")
+@pytest.mark.parametrize("runs", RUNS)
+def bench_load_history_filtered(benchmark, dash_app, history_at, runs):
+    # Фильтр идёт мимо кэша и проталкивается в Parquet
+    history_at("store", runs)()
+    benchmark(dash_app.load_history_df, columns=["m", "E_total"], filters=[("m", ">", 50)])
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+from data import make_event_log, series_events
+
+SERIES = [100, 1_000, 10_000, 100_000]
+
+
+@pytest.fixture(scope="module")
+def event_logs(workdir):
+    paths = {}
+    for n in SERIES:
+        path = os.path.join("runs", f"log-{n}", "events.jsonl")
+        make_event_log(path, n)
+        paths[n] = os.path.abspath(path)
+    return paths
+
+
+@pytest.mark.benchmark(group="dash log_tail: тик журнала с начала")
+@pytest.mark.parametrize("series", SERIES)
+def bench_log_tick(benchmark, event_logs, series):
+    # Первый тик update_log: чтение с нулевого смещения (с пропуском середины) и отрисовка блока
+    from log_tail import read_events, render_block
+
+    def tick():
+        events, _ = read_events(event_logs[series], 0)
+        return render_block(events)
+
+    benchmark(tick)
+
+
+@pytest.mark.benchmark(group="dash log_tail: отрисовка блока")
+@pytest.mark.parametrize("events", [100, 1_000, 10_000, 100_000])
+def bench_render_block(benchmark, events):
+    from log_tail import render_block
+    block = list(series_events(events // 8 + 1))[:events]
+    benchmark(render_block, block)
@@ -0,0 +1,26 @@
+import pytest
+
+from data import results_frame
+
+ROWS = [1_000, 10_000, 100_000, 1_000_000]
+
+
+@pytest.fixture(scope="module")
+def frames():
+    return {rows: results_frame(rows, runs=100) for rows in ROWS}
+
+
+@pytest.mark.benchmark(group="dash create_plots")
+@pytest.mark.parametrize("rows", ROWS)
+def bench_create_plots(benchmark, dash_app, frames, monkeypatch, rows):
+    # История подставляется готовой: меряем построение фигур, а не чтение (см. bench_history)
+    df = frames[rows]
+    monkeypatch.setattr(dash_app, "load_history_df", lambda columns=None, **kwargs: df[columns] if columns else df)
+    benchmark(dash_app.create_plots)
+
+
+@pytest.mark.benchmark(group="dash line_figure, зум")
+@pytest.mark.parametrize("rows", ROWS)
+def bench_line_figure_zoom(benchmark, dash_app, frames, rows):
+    from plots import line_figure
+    benchmark(line_figure, frames[rows], "E_kin", [10.0, 20.0])
@@ -0,0 +1,23 @@
+import pytest
+
+POINTS = [1_000, 10_000, 100_000, 1_000_000]
+
+
+@pytest.mark.benchmark(group="QT get_plot_data, промах кэша")
+@pytest.mark.parametrize("points", POINTS)
+def bench_plot_data_cold(benchmark, qt_task, points):
+    task = qt_task.Task({"a": 1.5, "b": 2.0, "points": points})
+
+    def clear():
+        qt_task.plot_x.cache_clear()
+        qt_task.plot_curve.cache_clear()
+
+    benchmark.pedantic(task.get_plot_data, setup=clear, rounds=20)
+
+
+@pytest.mark.benchmark(group="QT get_plot_data, попадание в кэш")
+@pytest.mark.parametrize("points", POINTS)
+def bench_plot_data_warm(benchmark, qt_task, points):
+    task = qt_task.Task({"a": 1.5, "b": 2.0, "points": points})
+    task.get_plot_data()
+    benchmark(task.get_plot_data)
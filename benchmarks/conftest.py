@@ -0,0 +1,98 @@
+"""Бенчмарки горячих путей dash, interface/backend и QT.
+
+Запуск (из каталога benchmarks):
+
+    pytest --benchmark-save=baseline        # записать базу на своей машине до изменений
+    pytest                                  # сравнение с последней сохранённой базой, падение при регрессии
+    python scaling.py                       # кривые масштабирования по последнему сохранённому прогону
+
+Порог регрессии и место хранения базы заданы в pytest.ini. База — только локальная
+(.benchmarks/ в .gitignore): времена другой машины с тем же именем платформы сравнивать
+бессмысленно. Без сохранённой базы прогон только замеряет. После осознанного изменения
+кода или железа базу записывают заново.
+"""
+import glob
+import importlib.util
+import os
+import sys
+import types
+
+import pytest
+from pytest_benchmark.utils import get_machine_id
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASH_DIR = os.path.join(ROOT, "dash")
+BACKEND_DIR = os.path.join(ROOT, "interface", "backend")
+QT_DIR = os.path.join(ROOT, "QT")
+
+# dash импортирует соседние модули по имени (from task import ...), backend — пакет app.
+# Оба dash/app.py и QT/task.py грузятся под своими именами, чтобы не спорить с ними.
+sys.path.insert(0, DASH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+
+def pytest_configure(config):
+    # База хранится рядом с бенчмарками, откуда бы ни запускали pytest
+    storage = config.option.benchmark_storage
+    if storage.startswith("file://") and not os.path.isabs(storage[len("file://"):]):
+        storage = "file://" + os.path.join(os.path.dirname(__file__), storage[len("file://"):])
+        config.option.benchmark_storage = storage
+
+    # Первый прогон на машине сравнивать не с чем: вместо ошибки pytest-benchmark просто замеряем
+    saved = glob.glob(os.path.join(storage[len("file://"):], get_machine_id(), "*.json"))
+    if config.option.benchmark_compare is True and not saved:
+        config.option.benchmark_compare = False
+        config.option.benchmark_compare_fail = None
+
+
+def load_module(name: str, path: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def no_sleep(monkeypatch):
+    """no_sleep(module) подменяет module.time копией time без пауз: меряем код, а не time.sleep."""
+    import time
+    fake = types.ModuleType("time")
+    fake.__dict__.update(time.__dict__)
+    fake.sleep = lambda seconds: None
+
+    def patch(module):
+        monkeypatch.setattr(module, "time", fake)
+    return patch
+
+
+@pytest.fixture(scope="session")
+def workdir(tmp_path_factory):
+    # Все модули пишут по относительным путям (runs/, history_store/, history.db) —
+    # работаем во временном каталоге, чтобы не трогать данные репозитория
+    path = tmp_path_factory.mktemp("bench")
+    old = os.getcwd()
+    os.chdir(path)
+    yield path
+    os.chdir(old)
+
+
+@pytest.fixture(scope="session")
+def dash_app(workdir):
+    return load_module("dash_app", os.path.join(DASH_DIR, "app.py"))
+
+
+@pytest.fixture(scope="session")
+def qt_task():
+    return load_module("qt_task", os.path.join(QT_DIR, "task.py"))
+
+
+@pytest.fixture(scope="session")
+def backend(workdir):
+    # app в interface/backend — пакет без __init__.py, и обычный модуль dash/app.py его перекрывает;
+    # на время импорта убираем dash из sys.path
+    sys.path.remove(DASH_DIR)
+    try:
+        return importlib.import_module("app.fast_api")
+    finally:
+        sys.path.insert(1, DASH_DIR)
@@ -0,0 +1,83 @@
+# Генераторы синтетических данных для бенчмарков. Всё детерминировано (seed),
+# чтобы замеры разных запусков считались на одинаковых входах.
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+INPUT_RANGES = {
+    "m": (1.0, 100.0),
+    "g": (9.0, 10.0),
+    "h": (0.0, 100.0),
+    "V": (0.0, 50.0),
+    "T": (0.0, 200.0),
+    "SPECIFIC_HEAT": (400.0, 4200.0),
+}
+
+
+def series_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    """n серий входных параметров, как их собирает add_series."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({k: rng.uniform(lo, hi, n) for k, (lo, hi) in INPUT_RANGES.items()})
+
+
+def results_frame(n: int, seed: int = 0, runs: int = 1) -> pd.DataFrame:
+    """Строки results.csv с посчитанными выходами; runs > 1 — с колонкой run."""
+    df = series_frame(n, seed)
+    df.insert(0, "series", np.arange(1, n + 1))
+    df["E_pot"] = df["m"] * df["g"] * df["h"]
+    df["E_kin"] = 0.5 * df["m"] * df["V"] ** 2
+    df["E_total"] = df["E_pot"] + df["E_kin"]
+    df["Q"] = df["m"] * df["SPECIFIC_HEAT"] * (df["T"] - 20)
+    if runs > 1:
+        df["run"] = [f"run-{i % runs:05d}" for i in range(n)]
+    return df
+
+
+def make_runs(base_dir: str, runs: int, rows_per_run: int = 20, finished: bool = False) -> list:
+    """Каталоги runs/<run>/results.csv; finished — с завершённым events.jsonl."""
+    os.makedirs(base_dir, exist_ok=True)
+    names = []
+    for i in range(runs):
+        name = f"run-{i:05d}"
+        run_dir = os.path.join(base_dir, name)
+        os.makedirs(run_dir, exist_ok=True)
+        results_frame(rows_per_run, seed=i).to_csv(os.path.join(run_dir, "results.csv"), index=False)
+        if finished:
+            with open(os.path.join(run_dir, "events.jsonl"), "w", encoding="utf-8") as f:
+                f.write(json.dumps({"type": "run_finish", "duration": 1.0}) + "\n")
+        names.append(name)
+    return names
+
+
+def series_events(n: int, seed: int = 0):
+    """События журнала для n серий в том порядке, в каком их пишет Task.solve."""
+    df = results_frame(n, seed)
+    yield {"type": "run_start", "total": n}
+    for row in df.itertuples(index=False):
+        yield {"type": "series_start", "series": row.series}
+        yield {"type": "params", "series": row.series,
+               "params": {"m": row.m, "g": row.g, "h": row.h, "V": row.V, "T": row.T}}
+        for name in ("E_pot", "E_kin", "E_total", "Q"):
+            yield {"type": "step", "series": row.series, "name": name, "value": getattr(row, name)}
+        yield {"type": "series_finish", "series": row.series, "duration": 1.6}
+    yield {"type": "run_summary", "calculated": n, "failed": 0}
+    yield {"type": "run_finish", "duration": 1.6 * n}
+
+
+def make_event_log(path: str, n: int) -> int:
+    """Пишет events.jsonl на n серий, возвращает размер файла."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for event in series_events(n):
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    return os.path.getsize(path)
+
+
+def history_rows(n: int, seed: int = 0) -> list:
+    """Строки истории backend (A1, B1, RES1..RES3)."""
+    rng = np.random.default_rng(seed)
+    a, b = rng.uniform(0, 10, n), rng.uniform(0, 10, n)
+    return [{"A1": x, "B1": y, "RES1": x + y, "RES2": x * y, "RES3": x - y}
+            for x, y in zip(a.tolist(), b.tolist())]
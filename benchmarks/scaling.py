@@ -0,0 +1,71 @@
+"""Кривые масштабирования по сохранённому прогону pytest-benchmark.
+
+    python scaling.py                  # последний прогон в .benchmarks
+    python scaling.py путь/к/0001_baseline.json
+
+Для каждой группы печатает среднее время по размерам входа и наклон в логарифмическом
+масштабе между соседними точками: ~1 — линейный рост, ~2 — квадратичный, ~0 — не зависит.
+"""
+import glob
+import json
+import math
+import os
+import sys
+from collections import defaultdict
+
+STORAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".benchmarks")
+
+
+def latest_run() -> str:
+    files = glob.glob(os.path.join(STORAGE, "*", "*.json"))
+    if not files:
+        sys.exit(f"Нет сохранённых прогонов в {STORAGE}: запустите pytest --benchmark-autosave")
+    return max(files, key=os.path.getmtime)
+
+
+def split_params(params: dict):
+    """(размер, остальные параметры) — размер берётся из единственного числового параметра."""
+    sizes = {k: v for k, v in params.items() if isinstance(v, int) and not isinstance(v, bool)}
+    if len(sizes) != 1:
+        return None, params
+    (key, size), = sizes.items()
+    return size, {k: v for k, v in params.items() if k != key}
+
+
+def curves(data: dict) -> dict:
+    result = defaultdict(list)  # (группа, тест, прочие параметры) -> [(размер, среднее)]
+    for bench in data["benchmarks"]:
+        size, rest = split_params(bench.get("params") or {})
+        if size is None:
+            continue
+        label = ", ".join(f"{k}={v}" for k, v in sorted(rest.items()))
+        func = bench["name"].split("[")[0]
+        result[bench["group"], func, label].append((size, bench["stats"]["mean"]))
+    return result
+
+
+def format_time(seconds: float) -> str:
+    for unit, scale in (("с", 1), ("мс", 1e-3), ("мкс", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.3g} {unit}"
+    return f"{seconds * 1e9:.3g} нс"
+
+
+def main(path: str):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    print(f"Прогон: {path}")
+    for (group, func, label), points in sorted(curves(data).items()):
+        points.sort()
+        print(f"\n{group} — {func}" + (f" ({label})" if label else ""))
+        previous = None
+        for size, mean in points:
+            slope = ""
+            if previous is not None and previous[1] > 0:
+                slope = f"  наклон {math.log(mean / previous[1]) / math.log(size / previous[0]):.2f}"
+            print(f"  {size:>10,}  {format_time(mean):>10}{slope}")
+            previous = (size, mean)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else latest_run())
@@ -1,49 +1,119 @@
 # app.py
 import os
 import base64
+import cProfile
+import itertools
+import logging
 import pandas as pd
+import shutil
 import threading
 import time
 from datetime import datetime
-import plotly.graph_objs as go
 import yaml
 
-from dash import Dash, html, dcc, dash_table, no_update
-from dash.dependencies import Input, Output, State, ALL
+from dash import Dash, html, dcc, dash_table, no_update, Patch
+from flask import Response
+from dash.dependencies import Input, Output, State, ALL, MATCH
 
-from task import Task
+from executors import EXECUTORS, execution_settings, run_series, split_chunks
+from event_log import EventLog, events_path
+import history_store
+import checkpoint
+import metrics
+from history_cache import HistoryCache
 from table_styles import TABLE_STYLES
+from table_query import TableQuery
+from sweep import DEFAULT_LEVELS, SWEEP_METHODS, sweep_chunks
+from plots import line_figure, line_plots, scatter3d_figure, surface_plot
+from formulas import DEFAULT_MODEL, load_model
+from scheduler import QueueFull, RunScheduler
+from series_buffer import SeriesBuffer, parse_series, prepare_import
+import log_tail
 
 BASE_DIR = "runs"
 os.makedirs(BASE_DIR, exist_ok=True)
+history_cache = HistoryCache(BASE_DIR)
 
 app = Dash(__name__, suppress_callback_exceptions=True)
 app.title = "Расчёт"
 
-# Глобальные переменные 
-parameter_series = pd.DataFrame()
-available_parameters = []
-yaml_config = {}
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
+logger = logging.getLogger("history")
+run_logger = logging.getLogger("runs")
+
+HISTORY_PAGE_SIZE = 10
+SERIES_PAGE_SIZE = 10
+history_query = TableQuery()
+
+metrics.gauge("nir_history_cache_rows", "Строк истории в кэше", lambda: history_cache.stats()["rows"])
+metrics.counter("nir_history_cache_hits_total", "Попадания в кэш истории", lambda: history_cache.stats()["hits"])
+metrics.counter("nir_history_cache_misses_total", "Промахи кэша истории", lambda: history_cache.stats()["misses"])
+
+
+@app.server.route("/metrics")
+def metrics_endpoint():
+    # Формат Prometheus: длительности шагов, записи, чтения истории и колбэков
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+def timed_callback(name):
+    return metrics.timed("nir_dash_callback_seconds", "Обработка колбэка Dash", callback=name)
+
+# Состояние сессий (загруженный YAML, модель формул) и очередь запусков — общие для сервера
+scheduler = RunScheduler()
+metrics.gauge("nir_runs_queued", "Запусков в очереди", lambda: sum(r.status == "queued" for r in scheduler.runs.values()))
+metrics.gauge("nir_runs_running", "Запусков в работе", scheduler.running)
+profile_lock = threading.Lock()   # профилируется не больше одного запуска в процессе (run_tasks)
 
 # Вспомогательные функции 
 
-def load_history_df():
+@metrics.timed("nir_load_history_seconds", "Чтение истории (load_history_df)")
+def load_history_df(columns=None, runs=None, filters=None):
+    """История расчётов. columns/runs/filters ограничивают чтение, например filters=[("m", ">", 50)]."""
     if not os.path.exists(BASE_DIR):
         return pd.DataFrame()
-    
+    if filters:
+        return query_history(columns, runs, filters)
+
+    # Без фильтров история берётся из кэша; перечитываются только изменившиеся запуски
+    df = history_cache.frame(runs)
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+def query_history(columns=None, runs=None, filters=None):
+    """Запрос с фильтрами в обход кэша: фильтры проталкиваются в колоночное хранилище."""
+    # Завершённые запуски читаются из колоночного хранилища
+    ingested = history_store.ingested_runs()
     rows = []
-    for folder in os.listdir(BASE_DIR):
+    if ingested and (runs is None or ingested & set(runs)):
+        rows.append(history_store.scan(columns, runs, filters))
+
+    # Текущие (ещё не загруженные) запуски — из их results.csv
+    for folder in sorted(os.listdir(BASE_DIR)):
+        if folder in ingested or (runs is not None and folder not in runs):
+            continue
         csv_path = os.path.join(BASE_DIR, folder, "results.csv")
         if os.path.exists(csv_path):
             try:
                 df_part = pd.read_csv(csv_path)
                 df_part["run"] = folder
+                df_part = history_store.apply_filters(df_part, filters)
+                if columns is not None:
+                    df_part = df_part[[c for c in columns if c in df_part.columns]]
                 rows.append(df_part)
             except:
                 pass
     
+    rows = [r for r in rows if not r.empty]
     return pd.concat(rows, ignore_index=True) if rows else pd.DataFrame()
 
+def cache_info():
+    stats = history_cache.stats()
+    return (f"Кэш истории: попаданий {stats['hits'] + stats['combined_hits']}, "
+            f"промахов {stats['misses']}, вытеснено {stats['evictions']}")
+
+@metrics.timed("nir_render_seconds", "Построение компонентов страницы", view="history_table")
 def create_history_table():
     df = load_history_df()
     if df.empty:
@@ -58,155 +128,125 @@ def create_history_table():
             html.Button("Обновить историю", id="refresh-history-btn", n_clicks=0,
                         style={"padding": "6px 12px", "borderRadius": "6px", "border": "none", "backgroundColor": "#FF9800", "color": "#fff", "cursor": "pointer"}),
             dcc.Download(id="download-dataframe-csv"),
+            html.Span(cache_info(), id="history-cache-info", style={"marginLeft": "10px", "color": "#888", "fontSize": "12px"}),
         ], style={"marginBottom": "10px"}),
+        # Страницы, сортировка и фильтр считаются на сервере (update_history_page)
         dash_table.DataTable(
             id="history-data-table",
-            data=df.to_dict("records"),
+            data=[],
             columns=columns,
-            page_size=10,
-            page_action="native",
-            sort_action="native",
+            page_current=0,
+            page_size=HISTORY_PAGE_SIZE,
+            page_action="custom",
+            sort_action="custom",
             sort_mode="multi",
-            filter_action="native",
+            sort_by=[],
+            filter_action="custom",
+            filter_query="",
             editable=True,
             **TABLE_STYLES
         )
     ])
 
-def create_plots():
-    df = load_history_df()
+@metrics.timed("nir_render_seconds", "Построение компонентов страницы", view="plots")
+def create_plots(model=DEFAULT_MODEL):
+    # Набор графиков задаёт модель: plot и surface у выходных величин в param_config.yaml
+    plots = line_plots(model)
+    surface = surface_plot(model)
+    columns = {col for x_col, y_col, *_ in plots.values() for col in (x_col, y_col)} | set(surface or ())
+
+    # Для графиков читаем только нужные колонки
+    df = load_history_df(columns=sorted(columns))
     if df.empty:
         return html.Div("Нет данных для графиков", className="empty-state")
-    
-    input_params = ['m', 'g', 'h', 'V']
-    output_params = ['E_pot', 'E_kin', 'E_total']
-    
-    existing_inputs = [col for col in input_params if col in df.columns]
-    existing_outputs = [col for col in output_params if col in df.columns]
-    
-    if not existing_inputs or not existing_outputs:
-        return html.Div("Недостаточно данных", className="empty-state")
-    
+
     graphs = []
 
-    # 3D график E_total
-    if 'E_total' in df.columns and len(existing_inputs) >= 2:
-        param_x = existing_inputs[0]
-        param_y = existing_inputs[2] if len(existing_inputs) > 2 else existing_inputs[1]
-        fig_3d = go.Figure()
-        fig_3d.add_trace(go.Scatter3d(
-            x=df[param_x], y=df[param_y], z=df['E_total'], mode='markers',
-            marker=dict(size=8, color=df['E_total'], colorscale='Viridis', opacity=0.7, colorbar=dict(title='E_total')),
-            text=df.apply(lambda row: f"{param_x}: {row[param_x]:.2f}<br>{param_y}: {row[param_y]:.2f}<br>E_total: {row['E_total']:.2f}", axis=1),
-            hovertemplate='<b>%{text}</b><extra></extra>'
-        ))
-        fig_3d.update_layout(
-            title=f"3D: E_total от {param_x} и {param_y}",
-            scene=dict(xaxis_title=param_x, yaxis_title=param_y, zaxis_title='E_total'),
-            height=500
-        )
-        graphs.append(dcc.Graph(figure=fig_3d, id='3d-plot'))
-
-    # E_kin vs V
-    if 'E_kin' in df.columns and 'V' in df.columns:
-        sorted_df = df.sort_values('V')
-        fig_kin = go.Figure()
-        fig_kin.add_trace(go.Scatter(x=sorted_df['V'], y=sorted_df['E_kin'], mode='markers+lines',
-                                     marker=dict(size=8, opacity=0.7, color='red'),
-                                     line=dict(width=2, color='red')))
-        fig_kin.update_layout(title="Кинетическая энергия от скорости", xaxis_title="Скорость (V)", yaxis_title="E_kin", height=400)
-        graphs.append(dcc.Graph(figure=fig_kin, id='kinetic-plot'))
-
-    # E_pot vs h
-    if 'E_pot' in df.columns and 'h' in df.columns:
-        sorted_df = df.sort_values('h')
-        fig_pot = go.Figure()
-        fig_pot.add_trace(go.Scatter(x=sorted_df['h'], y=sorted_df['E_pot'], mode='markers+lines',
-                                     marker=dict(size=8, opacity=0.7, color='green'),
-                                     line=dict(width=2, color='green')))
-        fig_pot.update_layout(title="Потенциальная энергия от высоты", xaxis_title="h", yaxis_title="E_pot", height=400)
-        graphs.append(dcc.Graph(figure=fig_pot, id='potential-plot'))
+    # 3D график
+    if surface and all(col in df.columns for col in surface):
+        graphs.append(dcc.Graph(figure=scatter3d_figure(df, *surface), id='3d-plot'))
+
+    # Линейные графики; при зуме перестраиваются по видимому диапазону (zoom_line_plot)
+    for key, (x_col, y_col, *_) in plots.items():
+        if x_col in df.columns and y_col in df.columns:
+            graphs.append(dcc.Graph(figure=line_figure(df, key, plots=plots), id={'type': 'history-line-plot', 'key': key}))
+
+    if not graphs:
+        return html.Div("Недостаточно данных", className="empty-state")
 
     return html.Div(graphs)
 
-def format_log(log_text):
-    """Форматируем лог для красивого отображения с переносами и цветами."""
-    html_lines = []
-    series_blocks = log_text.split("===")
-    for block in series_blocks:
-        block = block.strip()
-        if not block:
-            continue
-        if block.startswith("Серия"):
-            html_lines.append(html.Div(f"=== {block} ===", style={"fontWeight": "bold", "marginTop": "10px"}))
-        elif block.startswith("Всего серий") or block.startswith("ВСЕ РАСЧЕТЫ ЗАВЕРШЕНЫ"):
-            html_lines.append(html.Div(block, style={"fontWeight": "bold", "color": "green", "marginTop": "10px"}))
-        else:
-            # Разбиваем на параметры и энергии
-            params_part = []
-            for part in block.split(" E_"):
-                part = part.strip()
-                if not part:
-                    continue
-                if part.startswith("pot"):
-                    params_part.append(html.Div(f"E_{part}", style={"marginLeft": "15px", "color": "green"}))
-                elif part.startswith("kin"):
-                    params_part.append(html.Div(f"E_{part}", style={"marginLeft": "15px", "color": "red"}))
-                elif part.startswith("total"):
-                    params_part.append(html.Div(f"E_{part}", style={"marginLeft": "15px", "fontWeight": "bold"}))
-                elif part.startswith("heat"):
-                    params_part.append(html.Div(f"E_{part}", style={"marginLeft": "15px", "color": "orange"}))
-                else:
-                    params_part.append(html.Div(f"E_{part}", style={"marginLeft": "15px"}))
-            html_lines.extend(params_part)
-    return html_lines
-
-
-# Layout 
-app.layout = html.Div(
-    style={"maxWidth": "1200px", "margin": "0 auto", "padding": "20px", "fontFamily": "Arial, sans-serif"},
-    children=[
-        html.H1("Расчёт параметров", style={"textAlign": "center", "marginBottom": "30px"}),
+# Layout: строится на каждую загрузку страницы, у каждой вкладки своя сессия
+def serve_layout():
+    return html.Div(
+        style={"maxWidth": "1200px", "margin": "0 auto", "padding": "20px", "fontFamily": "Arial, sans-serif"},
+        children=[
+            html.H1("Расчёт параметров", style={"textAlign": "center", "marginBottom": "30px"}),
 
-        html.Div([
-            dcc.Upload(
-                id='upload-parameters',
-                multiple=False,
-                style={"padding": "20px", "border": "2px dashed #aaa", "borderRadius": "8px", "textAlign": "center", "marginBottom": "20px", "backgroundColor": "#f9f9f9"},
-                children=html.Div(['Перетащите файл .yaml или ', html.A('выберите файл')])
+            html.Div([
+                dcc.Upload(
+                    id='upload-parameters',
+                    multiple=False,
+                    style={"padding": "20px", "border": "2px dashed #aaa", "borderRadius": "8px", "textAlign": "center", "marginBottom": "20px", "backgroundColor": "#f9f9f9"},
+                    children=html.Div(['Перетащите файл .yaml или ', html.A('выберите файл')])
+                ),
+                html.Div(id="uploaded-parameters-info")
+            ], style={"marginBottom": "20px"}),
+
+            html.Div(id="input-parameters-container", style={"marginBottom": "20px"}),
+
+            html.Div([
+                dcc.Dropdown(
+                    id="executor-select",
+                    options=[{"label": "Исполнитель из конфигурации", "value": ""}] + [{"label": e, "value": e} for e in EXECUTORS],
+                    value="",
+                    clearable=False,
+                    style={"width": "260px", "display": "inline-block", "verticalAlign": "middle", "marginRight": "10px", "textAlign": "left"}
+                ),
+                dcc.Input(id="workers-input", type="number", min=1, step=1, placeholder="воркеров",
+                          style={"width": "100px", "marginRight": "10px", "verticalAlign": "middle"}),
+                dcc.Checklist(id="profile-run", options=[{"label": " профилировать", "value": "on"}], value=[], inline=True,
+                              style={"display": "inline-block", "marginRight": "10px", "verticalAlign": "middle"}),
+                dcc.Dropdown(
+                    id="run-priority",
+                    options=[{"label": "Приоритет: высокий", "value": 1}, {"label": "Приоритет: обычный", "value": 0},
+                             {"label": "Приоритет: низкий", "value": -1}],
+                    value=0,
+                    clearable=False,
+                    style={"width": "200px", "display": "inline-block", "verticalAlign": "middle", "marginRight": "10px", "textAlign": "left"}
+                ),
+                html.Button("Запустить расчеты", id="run-btn", n_clicks=0,
+                            style={"padding": "10px 20px", "fontSize": "16px", "borderRadius": "8px",
+                                   "backgroundColor": "#4CAF50", "color": "#fff", "border": "none", "cursor": "pointer"}),
+                html.Div(id="run-status", style={"marginTop": "8px", "color": "#555"}),
+            ], style={"textAlign": "center"}),
+
+            html.H3("Лог вычислений", style={"marginTop": "30px"}),
+            html.Div(
+                "Лог появится здесь после запуска",
+                id="log-container",
+                style={"height": "200px", "overflowY": "scroll", "border": "1px solid #ddd",
+                       "padding": "10px", "borderRadius": "8px", "boxShadow": "0 2px 6px rgba(0,0,0,0.1)",
+                       "backgroundColor": "#f9f9f9", "marginBottom": "30px"}
             ),
-            html.Div(id="uploaded-parameters-info")
-        ], style={"marginBottom": "20px"}),
 
-        html.Div(id="input-parameters-container", style={"marginBottom": "20px"}),
+            dcc.Store(id="session-id", data=scheduler.new_session_id(), storage_type="session"),
+            dcc.Store(id="current-run-id", data=None),
+            dcc.Store(id="is-running", data=False),
+            dcc.Store(id="log-state", data=None),
+            dcc.Interval(id="log-interval", interval=1000, disabled=True, n_intervals=0),
 
-        html.Div([
-            html.Button("Запустить расчеты", id="run-btn", n_clicks=0,
-                        style={"padding": "10px 20px", "fontSize": "16px", "borderRadius": "8px",
-                               "backgroundColor": "#4CAF50", "color": "#fff", "border": "none", "cursor": "pointer"})
-        ], style={"textAlign": "center"}),
-
-        html.H3("Лог вычислений", style={"marginTop": "30px"}),
-        html.Div(
-            "Лог появится здесь после запуска",
-            id="log-container",
-            style={"height": "200px", "overflowY": "scroll", "border": "1px solid #ddd",
-                   "padding": "10px", "borderRadius": "8px", "boxShadow": "0 2px 6px rgba(0,0,0,0.1)",
-                   "backgroundColor": "#f9f9f9", "marginBottom": "30px"}
-        ),
-
-        dcc.Store(id="current-run-id", data=None),
-        dcc.Store(id="is-running", data=False),
-        dcc.Store(id="series-data", data=[]),
-        dcc.Interval(id="log-interval", interval=1000, disabled=True, n_intervals=0),
-
-        html.H3("История расчетов"),
-        html.Div(id="table-container", children=create_history_table(), style={"marginBottom": "30px"}),
-
-        html.H3("Графики результатов"),
-        html.Div(id="plots-container", children=create_plots())
-    ]
-)
+            # История и графики строятся после отдачи страницы (open_history), layout их не читает
+            html.H3("История расчетов"),
+            html.Div(id="table-container", children=html.Div("Загрузка истории…", className="empty-state"),
+                     style={"marginBottom": "30px"}),
+
+            html.H3("Графики результатов"),
+            html.Div(id="plots-container", children=html.Div("Загрузка графиков…", className="empty-state"))
+        ]
+    )
+
+app.layout = serve_layout
 
 #  Callbacks 
 @app.callback(
@@ -214,23 +254,29 @@ app.layout = html.Div(
     Output("input-parameters-container", "children"),
     Input("upload-parameters", "contents"),
     State("upload-parameters", "filename"),
+    State("session-id", "data"),
 )
-def load_parameters(contents, filename):
-    global current_parameters, parameter_series, available_parameters, yaml_config
-    
+@timed_callback("load_parameters")
+def load_parameters(contents, filename, session_id):
+    session = scheduler.session(session_id)
+
     if contents is None:
         return "", html.Div("Загрузите файл параметров")
 
     try:
         content_str = contents.split(",")[1]
         decoded = base64.b64decode(content_str).decode("utf-8")
-        yaml_config = yaml.safe_load(decoded)
+        config = yaml.safe_load(decoded)
+        # Формулы проверяются и компилируются здесь: ошибка в YAML не доходит до запуска
+        model = load_model(config)
+        session.config, session.model = config, model
 
-        constants = yaml_config.get("constants", {})
-        params = yaml_config.get("parameters", {})
+        constants = config.get("constants", {})
+        params = config.get("parameters", {})
 
-        current_parameters = {}
-        available_parameters = list(params.keys()) + list(constants.keys())
+        session.parameters = list(params.keys()) + list(constants.keys())
+        # Новая конфигурация — новый набор колонок, накопленные серии сбрасываются
+        session.series = SeriesBuffer(session.parameters)
 
         # создаём UI: слайдеры + константы
         input_controls = []
@@ -273,9 +319,57 @@ def load_parameters(contents, filename):
             ], style={"marginTop": "10px", "marginBottom": "20px"})
         )
 
-        input_controls.append(html.Div(id="series-table-container"))
+        # Серии хранятся на сервере (session.series); таблица получает только видимую страницу
+        input_controls.append(
+            html.Div([
+                dcc.Upload(
+                    id="import-series",
+                    multiple=False,
+                    children=html.Button("Импорт серий (CSV/YAML)",
+                                         style={"padding": "6px 12px", "borderRadius": "6px", "border": "none", "backgroundColor": "#009688", "color": "#fff", "cursor": "pointer"}),
+                    style={"display": "inline-block", "marginRight": "10px"}
+                ),
+                html.Button("Очистить серии", id="clear-series-btn", n_clicks=0,
+                            style={"padding": "6px 12px", "borderRadius": "6px", "border": "none", "backgroundColor": "#9E9E9E", "color": "#fff", "cursor": "pointer"}),
+                dash_table.DataTable(
+                    id="series-data-table",
+                    data=[],
+                    columns=[{"name": "№", "id": "series", "editable": False}] + [{"name": c, "id": c} for c in session.parameters],
+                    page_current=0,
+                    page_size=SERIES_PAGE_SIZE,
+                    page_count=1,
+                    page_action="custom",
+                    editable=True,
+                    **TABLE_STYLES
+                ),
+            ], id="series-table-container", style={"marginBottom": "20px"})
+        )
+
+        # Свип: точки строятся на сервере по диапазонам min/max/step и сразу идут в расчёт
+        input_controls.append(
+            html.Div([
+                html.H4("Свип по диапазонам параметров", style={"marginTop": "0"}),
+                dcc.Dropdown(
+                    id="sweep-method",
+                    options=[{"label": label, "value": key} for key, label in SWEEP_METHODS.items()],
+                    value="grid",
+                    clearable=False,
+                    style={"width": "260px", "display": "inline-block", "verticalAlign": "middle", "marginRight": "10px"}
+                ),
+                dcc.Input(id="sweep-samples", type="number", min=1, step=1, placeholder="точек (LHS/Соболь)",
+                          style={"width": "160px", "marginRight": "10px", "verticalAlign": "middle"}),
+                dcc.Input(id="sweep-levels", type="number", min=2, step=1, value=DEFAULT_LEVELS, placeholder="по шагу слайдера",
+                          style={"width": "130px", "marginRight": "10px", "verticalAlign": "middle"}),
+                dcc.Input(id="sweep-seed", type="number", step=1, placeholder="seed",
+                          style={"width": "90px", "marginRight": "10px", "verticalAlign": "middle"}),
+                html.Button("Запустить свип", id="run-sweep-btn", n_clicks=0,
+                            style={"padding": "6px 12px", "borderRadius": "6px", "border": "none", "backgroundColor": "#673AB7", "color": "#fff", "cursor": "pointer"}),
+                html.Div(id="sweep-feedback", style={"marginTop": "6px"})
+            ], style={"padding": "10px", "border": "1px solid #ddd", "marginBottom": "10px", "borderRadius": "8px"})
+        )
 
-        info = f"Файл {filename} загружен. Параметров: {len(available_parameters)} (слайдеров: {len(params)}, констант: {len(constants)})"
+        info = (f"Файл {filename} загружен. Параметров: {len(session.parameters)} (слайдеров: {len(params)}, констант: {len(constants)}), "
+                f"выходных величин: {len(model.outputs)}")
         return info, html.Div(input_controls)
         
     except Exception as e:
@@ -288,6 +382,7 @@ def load_parameters(contents, filename):
     State({'type': 'param', 'key': ALL}, 'id'),
     prevent_initial_call=False
 )
+@timed_callback("show_slider_values")
 def show_slider_values(values, ids):
     if not values:
         return []
@@ -295,23 +390,24 @@ def show_slider_values(values, ids):
 
 #  series
 @app.callback(
-    Output("series-data", "data"),
-    Output("series-table-container", "children"),
+    Output("series-data-table", "data", allow_duplicate=True),
+    Output("series-data-table", "page_count", allow_duplicate=True),
     Output("add-series-feedback", "children"),
     Input("add-series-btn", "n_clicks"),
-    State("series-data", "data"),
     State({'type': 'param', 'key': ALL}, 'value'),
     State({'type': 'param', 'key': ALL}, 'id'),
     State({'type': 'const', 'key': ALL}, 'value'),
     State({'type': 'const', 'key': ALL}, 'id'),
+    State("series-data-table", "page_current"),
+    State("series-data-table", "page_size"),
+    State("session-id", "data"),
     prevent_initial_call=True
 )
-def add_series(n_clicks, series_data, param_values, param_ids, const_values, const_ids):
-    global yaml_config
-    if yaml_config is None or yaml_config == {}:
-        return series_data, no_update, "Сначала загрузите param_config.yaml"
-    if series_data is None:
-        series_data = []
+@timed_callback("add_series")
+def add_series(n_clicks, param_values, param_ids, const_values, const_ids, page_current, page_size, session_id):
+    session = scheduler.session(session_id)
+    if not session.config:
+        return no_update, no_update, "Сначала загрузите param_config.yaml"
     row = {}
     if param_ids:
         for val, idd in zip(param_values, param_ids):
@@ -319,95 +415,351 @@ def add_series(n_clicks, series_data, param_values, param_ids, const_values, con
     if const_ids:
         for val, idd in zip(const_values, const_ids):
             row[idd.get('key')] = val
-    series_data.append(row)
-    df = pd.DataFrame(series_data)
-    table = dash_table.DataTable(
-        id="series-data-table",
-        data=df.to_dict("records"),
-        columns=[{"name": c, "id": c} for c in df.columns],
-        page_size=10,
-        page_action="native",
-        editable=True,
-        **TABLE_STYLES
-    ) if not df.empty else html.Div("Нет серий")
-    feedback = f"Серия добавлена (всего {len(series_data)})."
-    return series_data, table, feedback
+    row = session.series.append(row)
+    total = len(session.series)
+
+    # В браузер уходит только новая строка, и только если она на открытой странице
+    page_size = page_size or SERIES_PAGE_SIZE
+    data = no_update
+    if (page_current or 0) == (total - 1) // page_size:
+        data = Patch()
+        data.append(row)
+    return data, session.series.page_count(page_size), f"Серия добавлена (всего {total})."
+
+@app.callback(
+    Output("series-data-table", "data"),
+    Output("series-data-table", "page_count"),
+    Input("series-data-table", "page_current"),
+    Input("series-data-table", "page_size"),
+    State("session-id", "data"),
+)
+@timed_callback("update_series_page")
+def update_series_page(page_current, page_size, session_id):
+    series = scheduler.session(session_id).series
+    page_size = page_size or SERIES_PAGE_SIZE
+    return series.page(page_current or 0, page_size), series.page_count(page_size)
+
+@app.callback(
+    Output("series-data-table", "data", allow_duplicate=True),
+    Output("series-data-table", "page_count", allow_duplicate=True),
+    Output("series-data-table", "page_current"),
+    Output("add-series-feedback", "children", allow_duplicate=True),
+    Input("import-series", "contents"),
+    State("import-series", "filename"),
+    State("series-data-table", "page_size"),
+    State("session-id", "data"),
+    prevent_initial_call=True
+)
+@timed_callback("import_series")
+def import_series(contents, filename, page_size, session_id):
+    """Массовое добавление серий из CSV или YAML; недостающие колонки — значения по умолчанию."""
+    session = scheduler.session(session_id)
+    if contents is None:
+        return no_update, no_update, no_update, no_update
+    if not session.config:
+        return no_update, no_update, no_update, "Сначала загрузите param_config.yaml"
+    params = session.config.get("parameters", {}) or {}
+    constants = session.config.get("constants", {}) or {}
+    defaults = {key: p.get("default", p.get("min")) for key, p in params.items()}
+    defaults.update((key, c.get("value")) for key, c in constants.items())
+    try:
+        df = parse_series(base64.b64decode(contents.split(",")[1]), filename or "")
+        df, unknown = prepare_import(df, session.parameters, defaults)
+    except Exception as e:
+        return no_update, no_update, no_update, f"Ошибка импорта: {str(e)}"
+
+    first = len(session.series)
+    session.series.extend(df)
+    # Открываем страницу с первой импортированной серией
+    page_size = page_size or SERIES_PAGE_SIZE
+    page = first // page_size
+    feedback = f"Импортировано серий: {len(df)} (всего {len(session.series)})."
+    if unknown:
+        feedback += f" Пропущены колонки: {', '.join(map(str, unknown))}."
+    return session.series.page(page, page_size), session.series.page_count(page_size), page, feedback
+
+@app.callback(
+    Output("series-data-table", "data", allow_duplicate=True),
+    Output("series-data-table", "page_count", allow_duplicate=True),
+    Output("series-data-table", "page_current", allow_duplicate=True),
+    Output("add-series-feedback", "children", allow_duplicate=True),
+    Input("clear-series-btn", "n_clicks"),
+    State("session-id", "data"),
+    prevent_initial_call=True
+)
+@timed_callback("clear_series")
+def clear_series(n_clicks, session_id):
+    if not n_clicks:
+        return no_update, no_update, no_update, no_update
+    scheduler.session(session_id).series.clear()
+    return [], 1, 0, "Серии очищены."
+
+@app.callback(
+    Output("series-data-table", "data", allow_duplicate=True),
+    Output("add-series-feedback", "children", allow_duplicate=True),
+    Input("series-data-table", "data_timestamp"),
+    State("series-data-table", "data"),
+    State("series-data-table", "page_current"),
+    State("series-data-table", "page_size"),
+    State("session-id", "data"),
+    prevent_initial_call=True
+)
+@timed_callback("edit_series")
+def edit_series(timestamp, data, page_current, page_size, session_id):
+    """Правка ячейки в таблице переносится в серверный буфер серий."""
+    series = scheduler.session(session_id).series
+    try:
+        for row in data or []:
+            for column in series.columns:
+                series.set(int(row["series"]) - 1, column, row.get(column))
+    except (TypeError, ValueError, KeyError):
+        return series.page(page_current or 0, page_size or SERIES_PAGE_SIZE), "Значение серии должно быть числом"
+    return no_update, no_update
 
 # calculations
 @app.callback(
     Output("current-run-id", "data"),
     Output("is-running", "data"),
     Output("log-interval", "disabled"),
+    Output("run-status", "children", allow_duplicate=True),
     Input("run-btn", "n_clicks"),
-    State("series-data", "data"),
+    State("executor-select", "value"),
+    State("workers-input", "value"),
+    State("profile-run", "value"),
+    State("run-priority", "value"),
+    State("session-id", "data"),
     prevent_initial_call=True,
 )
-def run_calculations(n_clicks, series_data):
-    global parameter_series
-    if not series_data:
-        return None, False, True
-    parameter_series = pd.DataFrame(series_data)
-    if parameter_series.empty:
-        return None, False, True
-    folder = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    os.makedirs(os.path.join(BASE_DIR, folder), exist_ok=True)
-
-    def run_tasks_thread():
+@timed_callback("run_calculations")
+def run_calculations(n_clicks, executor, workers, profile, priority, session_id):
+    session = scheduler.session(session_id)
+    series = session.series.frame()
+    if series.empty:
+        return None, False, True, no_update
+    settings = execution_settings(session.config, executor, workers, "on" in (profile or []) or None)
+    chunks = split_chunks(series, settings["chunk_size"])
+    try:
+        folder = start_run(session_id, chunks, len(series), settings, {"kind": "series"}, series, priority)
+    except QueueFull as e:
+        return no_update, no_update, no_update, str(e)
+    return folder, True, False, run_status_text(folder)
+
+@app.callback(
+    Output("current-run-id", "data", allow_duplicate=True),
+    Output("is-running", "data", allow_duplicate=True),
+    Output("log-interval", "disabled", allow_duplicate=True),
+    Output("sweep-feedback", "children"),
+    Input("run-sweep-btn", "n_clicks"),
+    State("sweep-method", "value"),
+    State("sweep-samples", "value"),
+    State("sweep-levels", "value"),
+    State("sweep-seed", "value"),
+    State("executor-select", "value"),
+    State("workers-input", "value"),
+    State("profile-run", "value"),
+    State("run-priority", "value"),
+    State("session-id", "data"),
+    prevent_initial_call=True,
+)
+@timed_callback("run_sweep")
+def run_sweep(n_clicks, method, samples, levels, seed, executor, workers, profile, priority, session_id):
+    config = scheduler.session(session_id).config
+    if not n_clicks or not config:
+        return no_update, no_update, no_update, "Сначала загрузите param_config.yaml"
+    try:
+        settings = execution_settings(config, executor, workers, "on" in (profile or []) or None)
+        # Точки свипа почти не повторяются, а векторный расчёт дешевле поиска в кэше
+        settings["cache"] = False
+        # Зерно фиксируется всегда: по нему досчёт после перезапуска построит те же точки
+        seed = seed if seed is not None else checkpoint.new_seed()
+        # Пустое поле уровней — сетка по шагу слайдеров
+        levels = int(levels) if levels else None
+        total, chunks = sweep_chunks(config, method, settings["chunk_size"], samples, levels, seed)
+        source = {"kind": "sweep", "method": method, "samples": samples, "levels": levels, "seed": seed}
+        folder = start_run(session_id, chunks, total, settings, source, priority=priority)
+    except Exception as e:
+        return no_update, no_update, no_update, f"Ошибка: {str(e)}"
+    return folder, True, False, f"Свип поставлен в очередь: {total} точек ({SWEEP_METHODS[method]}). {run_status_text(folder)}"
+
+def new_run_dir():
+    """Папка нового запуска; запуски разных сессий в одну секунду получают суффикс."""
+    stamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    for n in itertools.count(1):
+        folder = stamp if n == 1 else f"{stamp}-{n}"
         try:
-            with open(os.path.join(BASE_DIR, folder, "log.txt"), "w", encoding="utf-8") as f:
-                f.write(f"Всего серий: {len(parameter_series)}\n")
-            for idx, row in parameter_series.iterrows():
-                try:
-                    Task(row.to_dict(), folder, idx).solve()
-                    time.sleep(0.1)
-                except Exception as e:
-                    with open(os.path.join(BASE_DIR, folder, "log.txt"), "a", encoding="utf-8") as f:
-                        f.write(f"Ошибка в серии {idx + 1}: {str(e)}\n")
-            with open(os.path.join(BASE_DIR, folder, "log.txt"), "a", encoding="utf-8") as f:
-                f.write("\nВСЕ РАСЧЕТЫ ЗАВЕРШЕНЫ\n")
-        except Exception as e:
-            with open(os.path.join(BASE_DIR, folder, "log.txt"), "a", encoding="utf-8") as f:
-                f.write(f"Ошибка: {str(e)}\n")
+            os.makedirs(os.path.join(BASE_DIR, folder))
+            return folder
+        except FileExistsError:
+            continue
 
-    threading.Thread(target=run_tasks_thread, daemon=True).start()
-    return folder, True, False
+def start_run(session_id, chunks, total, settings, source, series=None, priority=0):
+    """Создаёт папку запуска с манифестом и ставит расчёт в очередь планировщика."""
+    session = scheduler.session(session_id)
+    model = session.model  # запуск досчитывается той моделью, с которой стартовал
+    folder = new_run_dir()
+    checkpoint.write_manifest(os.path.join(BASE_DIR, folder), session.config, settings, model, total, source, series)
+    try:
+        scheduler.submit(folder, session_id, total, run_tasks, (folder, chunks, total, settings, model), priority or 0)
+    except QueueFull:
+        shutil.rmtree(os.path.join(BASE_DIR, folder), ignore_errors=True)
+        raise
+    return folder
+
+def run_status_text(folder):
+    status = scheduler.status(folder)
+    if status is None or status["status"] in ("done", "failed"):
+        return ""
+    if status["status"] == "running":
+        return f"Запуск {folder} считается, осталось ~{format_eta(status['eta'])}"
+    return f"Запуск {folder} в очереди: позиция {status['position']}, ожидание и расчёт ~{format_eta(status['eta'])}"
+
+def format_eta(seconds):
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} с"
+    if seconds < 3600:
+        return f"{seconds // 60} мин {seconds % 60} с"
+    return f"{seconds // 3600} ч {seconds % 3600 // 60} мин"
+
+def run_tasks(folder, chunks, total, settings, model, resumed=None):
+    """Считает блоки серий запуска; resumed — сколько серий уже было рассчитано до перезапуска."""
+    started = time.perf_counter()
+    run_dir = os.path.join(BASE_DIR, folder)
+    with EventLog(events_path(folder), settings["log_flush_interval"]) as events, checkpoint.Journal(run_dir) as journal:
+        # cProfile видит только поток запуска: при inline — весь расчёт, при пулах — раздачу и запись.
+        # Профилировщик в процессе один (с Python 3.12 второй enable() падает), а соседние запуски
+        # смешались бы с профилем, поэтому профилируем, только когда запуск в слотах один
+        profiler = None
+        if settings["profile"]:
+            if scheduler.running() <= 1 and profile_lock.acquire(blocking=False):
+                profiler = cProfile.Profile()
+            else:
+                events.emit("profile_skipped", reason="одновременно идут другие запуски")
+        try:
+            if resumed is None:
+                events.emit("run_start", total=total)
+            else:
+                events.emit("run_resume", done=resumed, remaining=total)
+            # Серии считаются блоками на выбранном исполнителе; ошибки отдельных строк пишет BatchTask
+            if profiler is not None:
+                profiler.enable()
+            try:
+                run_series(chunks, folder, settings, events, total, model, journal)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+                    profile_lock.release()
+                    events.emit("profile", path=metrics.save_profile(profiler, run_dir))
+            events.emit("run_finish", duration=time.perf_counter() - started)
+        except Exception as e:
+            # Ошибка уходит и в журнал, и планировщику — запуск помечается как failed
+            events.emit("run_error", error=str(e))
+            raise
+    history_store.ingest_run(BASE_DIR, folder)
+
+def resume_unfinished_runs():
+    """Ставит в очередь досчёт запусков, оборванных падением или закрытием приложения."""
+    runs = []
+    for folder in checkpoint.unfinished_runs(BASE_DIR):
+        run_dir = os.path.join(BASE_DIR, folder)
+        try:
+            manifest = checkpoint.read_manifest(run_dir)
+            model, remaining, chunks = checkpoint.prepare_resume(run_dir, manifest)
+        except Exception as e:
+            run_logger.warning("Запуск %s не удалось продолжить: %s", folder, e)
+            continue
+        # Досчёт не принадлежит ни одной сессии: на него действует только общий лимит очереди
+        try:
+            scheduler.submit(folder, None, remaining, run_tasks,
+                             (folder, chunks, remaining, manifest["settings"], model, manifest["total"] - remaining))
+        except QueueFull as e:
+            run_logger.warning("Запуск %s не поставлен в очередь: %s", folder, e)
+            continue
+        run_logger.info("Запуск %s продолжается: осталось серий %d из %d", folder, remaining, manifest["total"])
+        runs.append(folder)
+    return runs
 
 # log 
 @app.callback(
     Output("log-container", "children"),
+    Output("log-state", "data"),
     Output("is-running", "data", allow_duplicate=True),
     Output("log-interval", "disabled", allow_duplicate=True),
     Input("log-interval", "n_intervals"),
     State("current-run-id", "data"),
     State("is-running", "data"),
+    State("log-state", "data"),
     prevent_initial_call=True,
 )
-def update_log(n_intervals, run_id, is_running):
+@timed_callback("update_log")
+def update_log(n_intervals, run_id, is_running, log_state):
     if not run_id:
-        return "", False, True
-    log_path = os.path.join(BASE_DIR, run_id, "log.txt")
+        return "", None, False, True
+    log_path = events_path(run_id)
     if not os.path.exists(log_path):
-        return "Ожидание вычислений...", is_running, False
-    with open(log_path, "r", encoding="utf-8") as f:
-        log_content = f.read()
-    formatted_log = format_log(log_content)
-    if "ВСЕ РАСЧЕТЫ ЗАВЕРШЕНЫ" in log_content and is_running:
-        return formatted_log, False, True
-    return formatted_log, is_running, False
+        return "Ожидание вычислений...", None, is_running, False
+
+    # Смещение в журнале хранится у клиента: читаем и отрисовываем только новые строки
+    state = log_state if log_state and log_state.get("run") == run_id else None
+    events, offset = log_tail.read_events(log_path, state["offset"] if state else 0)
+    block = log_tail.render_block(events)
+
+    if state is None:
+        children = [block] if block else []
+        blocks = len(children)
+    elif block is None:
+        children = no_update
+        blocks = state["blocks"]
+    else:
+        children = Patch()
+        children.append(block)
+        blocks = state["blocks"] + 1
+        if blocks > log_tail.LOG_MAX_BLOCKS:
+            del children[0]
+            blocks -= 1
+
+    log_state = {"run": run_id, "offset": offset, "blocks": blocks}
+    if any(e["type"] in log_tail.FINAL_EVENTS for e in events) and is_running:
+        return children, log_state, False, True
+    return children, log_state, is_running, False
+
 
+@app.callback(
+    Output("run-status", "children"),
+    Input("log-interval", "n_intervals"),
+    State("current-run-id", "data"),
+    prevent_initial_call=True,
+)
+@timed_callback("update_run_status")
+def update_run_status(n_intervals, run_id):
+    """Позиция запуска в очереди и оценка времени до завершения."""
+    return run_status_text(run_id) if run_id else ""
 
 #history and plots
+@app.callback(
+    Output("table-container", "children", allow_duplicate=True),
+    Output("plots-container", "children", allow_duplicate=True),
+    Input("session-id", "data"),
+    prevent_initial_call="initial_duplicate",
+)
+@timed_callback("open_history")
+def open_history(session_id):
+    # Один раз при открытии страницы; строки таблицы дальше приходят страницами (update_history_page)
+    return create_history_table(), create_plots(scheduler.session(session_id).model)
+
 @app.callback(
     Output("table-container", "children", allow_duplicate=True),
     Output("plots-container", "children", allow_duplicate=True),
     Input("is-running", "data"),
     State("current-run-id", "data"),
+    State("session-id", "data"),
     prevent_initial_call=True,
 )
-def auto_update_on_completion(is_running, run_id):
+@timed_callback("auto_update_on_completion")
+def auto_update_on_completion(is_running, run_id, session_id):
     if not is_running and run_id:
         time.sleep(0.5)
-        return create_history_table(), create_plots()
+        return create_history_table(), create_plots(scheduler.session(session_id).model)
     return no_update, no_update
 
 @app.callback(
@@ -415,17 +767,67 @@ def auto_update_on_completion(is_running, run_id):
     Output("plots-container", "children"),
     Input("refresh-history-btn", "n_clicks"),
     State("is-running", "data"),
+    State("session-id", "data"),
 )
-def update_table_and_plots(n_clicks, is_running):
+@timed_callback("update_table_and_plots")
+def update_table_and_plots(n_clicks, is_running, session_id):
     if n_clicks and not is_running:
-        return create_history_table(), create_plots()
+        return create_history_table(), create_plots(scheduler.session(session_id).model)
     return no_update, no_update
 
+@app.callback(
+    Output("history-data-table", "data"),
+    Output("history-data-table", "page_count"),
+    Input("history-data-table", "page_current"),
+    Input("history-data-table", "page_size"),
+    Input("history-data-table", "sort_by"),
+    Input("history-data-table", "filter_query"),
+)
+@timed_callback("update_history_page")
+def update_history_page(page_current, page_size, sort_by, filter_query):
+    started = time.perf_counter()
+    df = load_history_df()
+    if df.empty:
+        return [], 1
+    rows, page_count, matched = history_query.page(df, filter_query, sort_by, page_current, page_size or HISTORY_PAGE_SIZE)
+    logger.info("history page=%s filter=%r sort=%s: %d из %d строк за %.1f мс",
+                page_current, filter_query, sort_by, matched, len(df), (time.perf_counter() - started) * 1000)
+    return rows, page_count
+
+@app.callback(
+    Output({"type": "history-line-plot", "key": MATCH}, "figure"),
+    Input({"type": "history-line-plot", "key": MATCH}, "relayoutData"),
+    State({"type": "history-line-plot", "key": MATCH}, "id"),
+    State("session-id", "data"),
+    prevent_initial_call=True,
+)
+@timed_callback("zoom_line_plot")
+def zoom_line_plot(relayout, plot_id, session_id):
+    """При зуме перечитывает историю только в видимом диапазоне X и прореживает заново."""
+    if not relayout:
+        return no_update
+    key = plot_id["key"]
+    plots = line_plots(scheduler.session(session_id).model)
+    if key not in plots:
+        return no_update
+    x_col, y_col, *_ = plots[key]
+    if relayout.get("xaxis.autorange"):
+        return line_figure(load_history_df(columns=[x_col, y_col]), key, plots=plots)
+    if "xaxis.range[0]" not in relayout or "xaxis.range[1]" not in relayout:
+        return no_update
+
+    x_range = [relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]]
+    df = load_history_df(columns=[x_col, y_col], filters=[(x_col, ">=", x_range[0]), (x_col, "<=", x_range[1])])
+    if df.empty:
+        return no_update
+    return line_figure(df, key, x_range, plots)
+
 @app.callback(
     Output("download-dataframe-csv", "data"),
     Input("import-results-btn", "n_clicks"),
     prevent_initial_call=True,
 )
+@timed_callback("import_to_csv")
 def import_to_csv(n_clicks):
     df = load_history_df()
     if df.empty:
@@ -434,4 +836,12 @@ def import_to_csv(n_clicks):
 
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    # DEBUG=0 — без отладки и перезагрузчика
+    debug = os.environ.get("DEBUG", "1").lower() not in ("0", "false", "no")
+    # Перезагрузчик запускает сервер в дочернем процессе (WERKZEUG_RUN_MAIN=true), а родитель
+    # только следит за файлами — досчёт не ставим лишь в нём
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        # Завершённые запуски, ещё не загруженные в хранилище истории, — до первого чтения истории
+        history_store.ingest_pending(BASE_DIR)
+        resume_unfinished_runs()
+    app.run(debug=debug)
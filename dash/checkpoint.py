@@ -0,0 +1,167 @@
+# Манифест и журнал завершения запуска: после перезапуска приложения досчитываются только недостающие серии
+import json
+import os
+import secrets
+
+import numpy as np
+import pandas as pd
+
+from executors import split_chunks
+from formulas import Model
+from sweep import sweep_chunks
+
+MANIFEST = "manifest.json"
+JOURNAL = "journal.jsonl"
+SERIES = "series.csv"
+RESULTS = "results.csv"
+
+
+def new_seed() -> int:
+    """Зерно для свипа без заданного seed: записывается в манифест, чтобы точки можно было повторить."""
+    return secrets.randbits(32)
+
+
+def write_manifest(run_dir: str, config: dict, settings: dict, model: Model, total: int,
+                   source: dict, series: pd.DataFrame = None):
+    """Сохраняет всё, из чего можно заново построить серии запуска.
+
+    Номер серии — индекс строки + 1, он одинаков при первом расчёте и при досчёте.
+    Серии, добавленные вручную, лежат в series.csv; свип восстанавливается по
+    методу, числу точек и зерну из source.
+    """
+    if series is not None:
+        series.to_csv(os.path.join(run_dir, SERIES), index_label="index")
+    manifest = {
+        "total": int(total),
+        "source": source,
+        "settings": settings,
+        "model": {"inputs": model.inputs, "outputs": model.specs},
+        "config": config,
+    }
+    path = os.path.join(run_dir, MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, default=str)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def interrupted(run_dir: str) -> bool:
+    """Запуск с манифестом, оборванный до run_finish/run_error (процесс упал или был закрыт).
+
+    Запуск без журнала событий не успел начаться — он ждал в очереди и тоже досчитывается.
+    """
+    events = os.path.join(run_dir, "events.jsonl")
+    if not os.path.exists(os.path.join(run_dir, MANIFEST)):
+        return False
+    if not os.path.exists(events):
+        return True
+    with open(events, "rb") as f:
+        f.seek(max(0, os.path.getsize(events) - 512))
+        tail = f.read().decode("utf-8", errors="ignore")
+    return '"run_finish"' not in tail and '"run_error"' not in tail
+
+
+def unfinished_runs(base_dir: str) -> list:
+    if not os.path.exists(base_dir):
+        return []
+    return [run for run in sorted(os.listdir(base_dir)) if interrupted(os.path.join(base_dir, run))]
+
+
+def read_manifest(run_dir: str):
+    path = os.path.join(run_dir, MANIFEST)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class Journal:
+    """Журнал завершённых блоков: строка на блок, дописывается после записи его результатов.
+
+    offset — размер results.csv сразу после записи блока. Всё, что в файле дальше
+    последнего offset, записано блоком, который не успел попасть в журнал.
+    """
+
+    def __init__(self, run_dir: str):
+        self.file = open(os.path.join(run_dir, JOURNAL), "a", encoding="utf-8")
+
+    def record(self, first: int, last: int, offset: int):
+        self.file.write(json.dumps({"first": first, "last": last, "offset": offset}) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_journal(run_dir: str) -> tuple:
+    """Готовые диапазоны серий [(first, last)] и размер results.csv по последней записи."""
+    path = os.path.join(run_dir, JOURNAL)
+    done, offset = [], 0
+    if not os.path.exists(path):
+        return done, offset
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # оборванная последняя строка
+            done.append((record["first"], record["last"]))
+            offset = max(offset, record["offset"])
+    return done, offset
+
+
+def truncate_results(run_dir: str, offset: int):
+    """Отрезает от results.csv строки блоков, не попавших в журнал: при досчёте они не задвоятся."""
+    path = os.path.join(run_dir, RESULTS)
+    if os.path.exists(path) and os.path.getsize(path) > offset:
+        with open(path, "rb+") as f:
+            f.truncate(offset)
+
+
+def done_mask(index: np.ndarray, done: list) -> np.ndarray:
+    """Для номеров серий index — True, если серия уже есть в журнале."""
+    if not done:
+        return np.zeros(len(index), dtype=bool)
+    done = sorted(done)
+    starts = np.array([first for first, _ in done])
+    ends = np.array([last for _, last in done])
+    pos = np.searchsorted(starts, index, side="right") - 1
+    return (pos >= 0) & (index <= ends[np.maximum(pos, 0)])
+
+
+def remaining_chunks(chunks, done: list):
+    """Блоки без уже рассчитанных серий; полностью готовые блоки пропускаются."""
+    for chunk in chunks:
+        mask = done_mask(chunk.index.to_numpy() + 1, done)
+        if not mask.all():
+            yield chunk[~mask] if mask.any() else chunk
+
+
+def source_chunks(run_dir: str, manifest: dict):
+    """Заново строит блоки серий запуска по манифесту."""
+    chunk_size = manifest["settings"]["chunk_size"]
+    source = manifest["source"]
+    if source["kind"] == "series":
+        series = pd.read_csv(os.path.join(run_dir, SERIES), index_col="index")
+        return split_chunks(series, chunk_size)
+    _, chunks = sweep_chunks(manifest["config"], source["method"], chunk_size,
+                             source.get("samples"), source.get("levels"), source.get("seed"))
+    return chunks
+
+
+def prepare_resume(run_dir: str, manifest: dict) -> tuple:
+    """Готовит запуск к досчёту: (модель, число оставшихся серий, ленивые блоки оставшихся серий)."""
+    done, offset = read_journal(run_dir)
+    truncate_results(run_dir, offset)
+    finished = sum(last - first + 1 for first, last in done)
+    model = Model(manifest["model"]["inputs"], manifest["model"]["outputs"])
+    chunks = remaining_chunks(source_chunks(run_dir, manifest), done)
+    return model, manifest["total"] - finished, chunks
@@ -0,0 +1,77 @@
+# Журнал событий запуска: events.jsonl, одна JSON-запись на строку
+import json
+import os
+import threading
+import time
+
+# Один кодировщик на процесс: json.dumps с параметрами создаёт новый на каждое событие
+ENCODER = json.JSONEncoder(ensure_ascii=False, default=float)
+
+
+class EventLog:
+    """Буферизованная запись событий (run_start, series_done, series_error, ...).
+
+    События копятся в памяти и сбрасываются в файл не реже раза в flush_interval
+    секунд (фоновым потоком), при переполнении буфера и при закрытии журнала.
+    flush_interval=0 — писать сразу.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.5, max_buffer: int = 10000):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+
+        self.stopped = threading.Event()
+        self.flusher = None
+        if flush_interval > 0:
+            self.flusher = threading.Thread(target=self.flush_periodically, daemon=True)
+            self.flusher.start()
+
+    def emit(self, kind: str, **fields):
+        self.emit_many([{"type": kind, **fields}])
+
+    def emit_many(self, events: list):
+        now = time.time()
+        encode = ENCODER.encode
+        lines = [encode({"ts": now, **e} if "ts" not in e else e) for e in events]
+        with self.lock:
+            self.buffer.extend(lines)
+            if self.flush_interval <= 0 or len(self.buffer) >= self.max_buffer:
+                self.flush_locked()
+
+    def flush_periodically(self):
+        while not self.stopped.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def flush_locked(self):
+        if not self.buffer or self.file.closed:
+            return
+        self.file.write("\n".join(self.buffer) + "\n")
+        self.file.flush()
+        self.buffer.clear()
+
+    def close(self):
+        self.stopped.set()
+        if self.flusher is not None:
+            self.flusher.join()
+        with self.lock:
+            self.flush_locked()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def events_path(folder: str) -> str:
+    return os.path.join("runs", folder, "events.jsonl")
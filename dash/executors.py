@@ -0,0 +1,154 @@
+# Исполнители серий: inline, пул потоков, пул процессов
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import pandas as pd
+
+from event_log import EventLog
+from results_writer import ResultsWriter
+from formulas import DEFAULT_MODEL, Model
+from result_cache import ResultCache, get_cache
+from task import BatchTask
+
+EXECUTORS = ["inline", "thread", "process"]
+
+DEFAULT_EXECUTION = {
+    "executor": "inline",
+    "workers": None,
+    "chunk_size": 1000,
+    "log_flush_interval": 0.5,
+    "profile": False,
+    "cache": True,                     # общий кэш результатов серий между запусками
+    "cache_path": "cache/results.db",
+    "cache_size": 100_000,             # записей; сверх — вытесняются давно не использованные
+}
+
+
+class InlineExecutor(Executor):
+    """Выполняет задачи сразу в вызывающем потоке (без пула)."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def execution_settings(config: dict = None, executor: str = None, workers: int = None,
+                       profile: bool = None) -> dict:
+    """Настройки запуска: секция execution из param_config.yaml, поверх — выбор для текущего запуска."""
+    settings = dict(DEFAULT_EXECUTION)
+    settings.update((config or {}).get("execution", {}) or {})
+    if executor:
+        settings["executor"] = executor
+    if workers:
+        settings["workers"] = workers
+    if profile is not None:
+        settings["profile"] = profile
+
+    if settings["executor"] not in EXECUTORS:
+        raise ValueError(f"Unknown executor: {settings['executor']}")
+    settings["workers"] = int(settings["workers"] or os.cpu_count() or 1)
+    settings["chunk_size"] = max(1, int(settings["chunk_size"]))
+    settings["log_flush_interval"] = float(settings["log_flush_interval"])
+    settings["profile"] = bool(settings["profile"])
+    settings["cache"] = bool(settings["cache"])
+    settings["cache_size"] = max(1, int(settings["cache_size"]))
+    return settings
+
+
+def make_executor(kind: str, workers: int) -> Executor:
+    if kind == "thread":
+        return ThreadPoolExecutor(max_workers=workers)
+    if kind == "process":
+        return ProcessPoolExecutor(max_workers=workers)
+    return InlineExecutor()
+
+
+def split_chunks(df: pd.DataFrame, chunk_size: int) -> list:
+    return [df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+
+
+def compute_chunk(chunk: pd.DataFrame, folder: str, model: Model = None, cache: ResultCache = None):
+    """Считает один блок серий в воркере.
+
+    Возвращает (имя воркера, результаты, события, время расчёта, серий из кэша).
+    """
+    started = time.perf_counter()
+    worker = f"pid {os.getpid()}/{threading.current_thread().name}"
+    task = BatchTask(chunk, folder, model=model, cache=cache)
+    results, events = task.compute()
+    return worker, results, events, time.perf_counter() - started, task.cache_hits
+
+
+def run_series(chunks, folder: str, settings: dict, events: EventLog, total: int = None,
+               model: Model = None, journal=None):
+    """Раздаёт блоки серий воркерам и пишет результаты строго в порядке серий.
+
+    chunks — любой итерируемый набор DataFrame-блоков (индекс = номер серии - 1), в том
+    числе ленивый генератор: одновременно в работе держится не больше 2 * workers блоков.
+    journal (checkpoint.Journal) получает каждый блок, чьи результаты уже на диске.
+    """
+    model = model or DEFAULT_MODEL
+    cache = get_cache(settings["cache_path"], settings["cache_size"]) if settings.get("cache") else None
+    results_writer = ResultsWriter(os.path.join("runs", folder, "results.csv"), model.columns)
+    chunk_count = -(-total // settings["chunk_size"]) if total is not None else None
+    events.emit("executor", executor=settings["executor"], workers=settings["workers"], chunks=chunk_count)
+
+    source = enumerate(chunks)
+    pending = {}
+    done = {}
+    next_chunk = 0
+    submitted = 0
+    calculated = 0
+    cache_hits = 0
+
+    with results_writer, make_executor(settings["executor"], settings["workers"]) as executor:
+        def submit_next():
+            nonlocal submitted
+            item = next(source, None)
+            if item is None:
+                return False
+            i, chunk = item
+            pending[executor.submit(compute_chunk, chunk, folder, model, cache)] = (i, chunk.index[0], chunk.index[-1], len(chunk))
+            submitted += len(chunk)
+            return True
+
+        while len(pending) < 2 * settings["workers"] and submit_next():
+            pass
+
+        while pending:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                i, first, last, size = pending.pop(future)
+                try:
+                    worker, results, chunk_events, duration, hits = future.result()
+                    span = (int(first) + 1, int(last) + 1)
+                except Exception as e:
+                    worker, results, duration, span, hits = "-", pd.DataFrame(), None, None, 0
+                    chunk_events = [{"type": "chunk_error", "chunk": i + 1, "error": str(e)}]
+                events.emit("chunk_done", worker=worker, chunk=i + 1, chunks=chunk_count,
+                            first=int(first) + 1, last=int(last) + 1, duration=duration)
+                done[i] = (results, chunk_events, span)
+                cache_hits += hits
+                submit_next()
+
+            # Пишем все готовые блоки подряд, чтобы results.csv шёл в порядке серий
+            while next_chunk in done:
+                results, chunk_events, span = done.pop(next_chunk)
+                events.emit_many(chunk_events)
+                results_writer.write_frame(results)
+                # Блок с ошибкой в журнал не попадает и будет пересчитан при досчёте
+                if journal is not None and span is not None:
+                    journal.record(*span, results_writer.offset())
+                calculated += len(results)
+                next_chunk += 1
+
+    failed = submitted - calculated
+    events.emit("run_summary", calculated=calculated, failed=failed)
+    if cache is not None:
+        events.emit("cache_report", hits=cache_hits, misses=calculated - cache_hits)
@@ -0,0 +1,197 @@
+# Выходные величины модели: формулы из param_config.yaml, скомпилированные в векторные выражения NumPy
+import ast
+import hashlib
+import json
+
+import numpy as np
+
+FUNCTIONS = {
+    "sqrt": np.sqrt,
+    "exp": np.exp,
+    "log": np.log,
+    "log10": np.log10,
+    "sin": np.sin,
+    "cos": np.cos,
+    "tan": np.tan,
+    "abs": np.abs,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+    "where": np.where,
+}
+NAMES = {"pi": np.pi, "e": np.e}
+
+ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow, ast.USub, ast.UAdd,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq,
+)
+
+# Физика по умолчанию — для конфигураций без секции outputs
+DEFAULT_INPUTS = ["m", "g", "h", "V", "T", "SPECIFIC_HEAT"]
+DEFAULT_OUTPUTS = {
+    "E_pot": {"label": "E_pot (потенциальная)", "formula": "m * g * h",
+              "plot": {"x": "h", "color": "green", "title": "Потенциальная энергия от высоты"}},
+    "E_kin": {"label": "E_kin (кинетическая)", "formula": "0.5 * m * V ** 2",
+              "plot": {"x": "V", "color": "red", "title": "Кинетическая энергия от скорости", "x_title": "Скорость (V)"}},
+    "E_total": {"label": "E_total (полная)", "formula": "E_pot + E_kin", "surface": {"x": "m", "y": "h"}},
+    "Q": {"label": "E_heat (тепловая)", "formula": "m * SPECIFIC_HEAT * (T - 20)"},
+}
+
+
+def parse_formula(name: str, formula) -> tuple:
+    """Разбирает и проверяет формулу. Возвращает (дерево, имена, от которых она зависит)."""
+    if isinstance(formula, (int, float)) and not isinstance(formula, bool):
+        formula = repr(formula)
+    if not isinstance(formula, str) or not formula.strip():
+        raise ValueError(f"{name}: не задана формула")
+    try:
+        tree = ast.parse(formula.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"{name}: синтаксическая ошибка в формуле «{formula}»: {e.msg}")
+
+    names = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise ValueError(f"{name}: недопустимая конструкция {type(node).__name__} в формуле «{formula}»")
+        if isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float)):
+                raise ValueError(f"{name}: в формуле допустимы только числа, а не {node.value!r}")
+            # Целые числа — в float: 10 ** 10 ** 10 переполняется сразу, а не считается длинной арифметикой
+            try:
+                node.value = float(node.value)
+            except OverflowError:
+                raise ValueError(f"{name}: слишком большое число в формуле «{formula}»")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+                raise ValueError(f"{name}: неизвестная функция в формуле «{formula}» "
+                                 f"(доступны: {', '.join(FUNCTIONS)})")
+        elif isinstance(node, ast.Name) and node.id not in FUNCTIONS and node.id not in NAMES:
+            names.add(node.id)
+    return tree, names
+
+
+def order_outputs(deps: dict) -> list:
+    """Порядок вычисления: зависимости раньше зависимых, при прочих равных — порядок из YAML."""
+    order, done = [], set()
+    pending = list(deps)
+    while pending:
+        # Каждый раз — первая по YAML величина, все зависимости которой уже посчитаны
+        name = next((name for name in pending if deps[name] <= done), None)
+        if name is None:
+            raise ValueError(f"Циклическая зависимость формул: {', '.join(pending)}")
+        order.append(name)
+        done.add(name)
+        pending.remove(name)
+    return order
+
+
+class Model:
+    """Входные параметры и выходные величины с формулами.
+
+    Формулы проверяются и компилируются один раз; evaluate считает все серии
+    пакета разом — каждое выражение вычисляется над массивами NumPy целиком.
+    Одна серия (входы — числа) считается на обычных float, без массивов.
+    """
+
+    def __init__(self, inputs: list, outputs: dict):
+        self.inputs = list(inputs)
+        self.specs = {}
+        for name, spec in outputs.items():
+            spec = dict(spec) if isinstance(spec, dict) else {"formula": spec}
+            if not str(name).isidentifier():
+                raise ValueError(f"Недопустимое имя выходной величины: {name}")
+            if name in self.inputs:
+                raise ValueError(f"{name}: имя выходной величины совпадает с параметром")
+            self.specs[name] = spec
+        self.outputs = list(self.specs)
+
+        known = set(self.inputs) | set(self.outputs)
+        self.codes = {}
+        self.globals = {"__builtins__": {}, **FUNCTIONS}
+        trees, deps, used = {}, {}, set()
+        for name, spec in self.specs.items():
+            tree, names = parse_formula(name, spec.get("formula"))
+            unknown = sorted(names - known)
+            if unknown:
+                raise ValueError(f"{name}: неизвестные имена в формуле «{spec['formula']}»: {', '.join(unknown)}")
+            deps[name] = names & set(self.outputs)
+            used |= names - set(self.outputs)
+            trees[name] = tree
+            self.codes[name] = compile(tree, f"<{name}>", "eval")
+        self.order = order_outputs(deps)
+
+        # Для одной серии все формулы — одна функция от входов: без eval на каждую величину
+        self.scalar_inputs = [key for key in self.inputs if key in used]
+        source = f"def scalar({', '.join(self.scalar_inputs)}):\n"
+        source += "".join(f"    {name} = {ast.unparse(trees[name].body)}\n" for name in self.order)
+        source += f"    return ({', '.join(self.order)},)\n"
+        namespace = {**self.globals, **NAMES}
+        exec(compile(source, "<model>", "exec"), namespace)
+        self.scalar = namespace["scalar"]
+        # Арифметика float не предупреждает, а ошибки ловит evaluate; функции NumPy — предупреждают
+        self.scalar_calls = any(isinstance(node, ast.Call) for tree in trees.values() for node in ast.walk(tree))
+
+        # Графики, объявленные у выходных величин, ссылаются только на известные колонки
+        for name, spec in self.specs.items():
+            axes = [(spec.get("plot") or {}).get("x"), *((spec.get("surface") or {}).get(k) for k in ("x", "y"))]
+            for axis in axes:
+                if axis is not None and axis not in known:
+                    raise ValueError(f"{name}: на графике указана неизвестная величина {axis}")
+
+        self.labels = {name: spec.get("label") or (f"{name} ({spec['name']})" if spec.get("name") else name)
+                       for name, spec in self.specs.items()}
+        signature = {"inputs": self.inputs, "outputs": {n: str(s["formula"]) for n, s in self.specs.items()}}
+        self.version = hashlib.sha256(json.dumps(signature, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def columns(self) -> list:
+        """Колонки results.csv для этой модели."""
+        return ["series", *self.inputs, *self.outputs, "duration"]
+
+    def evaluate(self, values: dict) -> dict:
+        """values — входы (массивы одной длины или числа); возвращает выходные величины той же формы."""
+        first = next(iter(values.values()), 0.0)
+        shape = () if isinstance(first, (int, float)) else np.shape(first)
+        if not shape:
+            try:
+                return self.evaluate_scalar(values)
+            except ArithmeticError:
+                pass  # деление на ноль, переполнение: пересчёт через NumPy даёт inf и nan, как у пакета
+
+        namespace = {**NAMES, **{key: np.asarray(value, dtype=float) for key, value in values.items()}}
+        results = {}
+        with np.errstate(all="ignore"):
+            for name in self.order:
+                try:
+                    value = eval(self.codes[name], self.globals, namespace)
+                except OverflowError:
+                    # Остаётся только переполнение в выражении из одних чисел
+                    raise ValueError(f"{name}: переполнение в формуле «{self.specs[name]['formula']}»")
+                # Формула без входов (константа) растягивается на все серии
+                value = np.broadcast_to(np.asarray(value, dtype=float), shape)
+                namespace[name] = results[name] = value if shape else float(value)
+        return results
+
+    def evaluate_scalar(self, values: dict) -> dict:
+        args = [float(values[key]) for key in self.scalar_inputs]
+        if self.scalar_calls:
+            with np.errstate(all="ignore"):
+                outputs = self.scalar(*args)
+        else:
+            outputs = self.scalar(*args)
+        return {name: float(value) for name, value in zip(self.order, outputs)}
+
+    def __reduce__(self):
+        # В пул процессов уходит описание модели, формулы компилируются заново в воркере
+        return Model, (self.inputs, self.specs)
+
+
+def load_model(yaml_config: dict) -> Model:
+    """Модель из param_config.yaml: входы — parameters и constants, выходы — секция outputs."""
+    params = yaml_config.get("parameters", {}) or {}
+    constants = yaml_config.get("constants", {}) or {}
+    outputs = yaml_config.get("outputs") or DEFAULT_OUTPUTS
+    return Model(list(params) + list(constants), outputs)
+
+
+DEFAULT_MODEL = Model(DEFAULT_INPUTS, DEFAULT_OUTPUTS)
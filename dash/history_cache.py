@@ -0,0 +1,120 @@
+# Кэш истории расчётов в памяти процесса
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+import history_store
+
+
+class HistoryCache:
+    """Кэш таблиц результатов по запускам.
+
+    Запуск перечитывается, только если изменились mtime или размер его results.csv
+    (или он появился впервые). Суммарный объём ограничен max_rows: при переполнении
+    вытесняются запуски, к которым дольше всего не обращались.
+    """
+
+    def __init__(self, base_dir: str, max_rows: int = 2_000_000):
+        self.base_dir = base_dir
+        self.max_rows = max_rows
+        self.runs = OrderedDict()  # run -> (сигнатура, DataFrame); в начале — самые холодные
+        self.rows = 0
+        self.combined = None       # (ключ, DataFrame) последней собранной истории
+        self.hits = 0
+        self.misses = 0
+        self.combined_hits = 0
+        self.evictions = 0
+        self.lock = threading.RLock()
+
+    def signatures(self) -> dict:
+        sigs = {}
+        if not os.path.exists(self.base_dir):
+            return sigs
+        for run in sorted(os.listdir(self.base_dir)):
+            try:
+                st = os.stat(os.path.join(self.base_dir, run, "results.csv"))
+            except OSError:
+                continue
+            sigs[run] = (st.st_mtime_ns, st.st_size)
+        return sigs
+
+    def prefetch(self, sigs: dict, ingested: set) -> dict:
+        """Устаревшие в кэше запуски из хранилища — одним сканированием, а не по скану на запуск."""
+        stale = [run for run, sig in sigs.items()
+                 if run in ingested and (run not in self.runs or self.runs[run][0] != sig)]
+        if len(stale) < 2:
+            return {}
+        try:
+            df = history_store.scan(runs=stale)
+        except Exception:
+            return {}
+        return {run: part.reset_index(drop=True) for run, part in df.groupby("run", sort=False)}
+
+    def read_run(self, run: str, ingested: set, prefetched: dict) -> pd.DataFrame:
+        if run in prefetched:
+            return prefetched[run]
+        if run in ingested:
+            return history_store.scan(runs=[run])
+        df = pd.read_csv(os.path.join(self.base_dir, run, "results.csv"))
+        df["run"] = run
+        return df
+
+    def get_run(self, run: str, signature: tuple, ingested: set, prefetched: dict):
+        entry = self.runs.get(run)
+        if entry is not None and entry[0] == signature:
+            self.hits += 1
+            self.runs.move_to_end(run)
+            return entry[1]
+
+        self.misses += 1
+        try:
+            df = self.read_run(run, ingested, prefetched)
+        except Exception:
+            return None
+        if entry is not None:
+            self.rows -= len(entry[1])
+        self.runs[run] = (signature, df)
+        self.runs.move_to_end(run)
+        self.rows += len(df)
+        self.evict()
+        return df
+
+    def evict(self):
+        while self.rows > self.max_rows and len(self.runs) > 1:
+            _, (_, df) = self.runs.popitem(last=False)
+            self.rows -= len(df)
+            self.evictions += 1
+
+    def frame(self, runs: list = None) -> pd.DataFrame:
+        """История по всем (или выбранным) запускам. Результат общий — не изменять на месте."""
+        with self.lock:
+            sigs = self.signatures()
+            if runs is not None:
+                sigs = {run: sig for run, sig in sigs.items() if run in runs}
+            key = tuple(sigs.items())
+            if self.combined is not None and self.combined[0] == key:
+                self.combined_hits += 1
+                return self.combined[1]
+
+            ingested = history_store.ingested_runs()
+            prefetched = self.prefetch(sigs, ingested)
+            parts = [self.get_run(run, sig, ingested, prefetched) for run, sig in sigs.items()]
+            parts = [p for p in parts if p is not None and not p.empty]
+            df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+            # Собранную историю храним, только если она укладывается в лимит
+            self.combined = (key, df) if len(df) <= self.max_rows else None
+            return df
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "combined_hits": self.combined_hits,
+                "evictions": self.evictions,
+                "runs": len(self.runs),
+                "rows": self.rows,
+            }
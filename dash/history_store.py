@@ -0,0 +1,136 @@
+# Колоночное хранилище истории: завершённые запуски один раз переводятся в Parquet
+import os
+import shutil
+import threading
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # без pyarrow история читается из CSV, как раньше
+    pa = None
+
+STORE_DIR = "history_store"
+DONE_MARKER = "ВСЕ РАСЧЕТЫ ЗАВЕРШЕНЫ"  # итоговая строка старых текстовых логов
+
+# Операторы фильтров вида (колонка, оператор, значение)
+OPERATORS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    "in": lambda a, b: a.isin(list(b)),
+}
+
+_lock = threading.Lock()
+_dataset = None
+_dataset_key = None
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def partition_path(run: str) -> str:
+    return os.path.join(STORE_DIR, f"run={run}")
+
+
+def ingested_runs() -> set:
+    if not available() or not os.path.exists(STORE_DIR):
+        return set()
+    return {name[4:] for name in os.listdir(STORE_DIR) if name.startswith("run=")}
+
+
+def run_finished(base_dir: str, run: str) -> bool:
+    """Запуск завершён, если последнее событие его журнала — run_finish."""
+    for name, marker in (("events.jsonl", '"run_finish"'), ("log.txt", DONE_MARKER)):
+        log_path = os.path.join(base_dir, run, name)
+        if os.path.exists(log_path):
+            with open(log_path, "rb") as f:
+                f.seek(max(0, os.path.getsize(log_path) - 512))
+                return marker in f.read().decode("utf-8", errors="ignore")
+    return False
+
+
+def ingest_run(base_dir: str, run: str) -> bool:
+    """Переводит results.csv завершённого запуска в Parquet. Повторно запуск не загружается."""
+    if not available() or run in ingested_runs():
+        return False
+    csv_path = os.path.join(base_dir, run, "results.csv")
+    if not os.path.exists(csv_path):
+        return False
+
+    df = pd.read_csv(csv_path)
+    # Числа храним в float64, чтобы схемы разных запусков совпадали
+    for col in df.columns:
+        if col != "series" and pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype("float64")
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    # Пишем во временный каталог (с "_" его не видит dataset) и переименовываем целиком
+    tmp_dir = os.path.join(STORE_DIR, f"_tmp-{run}")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    pq.write_table(table, os.path.join(tmp_dir, "part-0.parquet"))
+    os.replace(tmp_dir, partition_path(run))
+    return True
+
+
+def ingest_pending(base_dir: str) -> list:
+    """Загружает в хранилище все завершённые, но ещё не загруженные запуски."""
+    if not available() or not os.path.exists(base_dir):
+        return []
+    done = ingested_runs()
+    ingested = []
+    for run in sorted(os.listdir(base_dir)):
+        if run not in done and run_finished(base_dir, run) and ingest_run(base_dir, run):
+            ingested.append(run)
+    return ingested
+
+
+def get_dataset():
+    """Dataset по всем разделам; пересоздаётся только при появлении новых запусков."""
+    global _dataset, _dataset_key
+    key = frozenset(ingested_runs())
+    with _lock:
+        if _dataset is None or _dataset_key != key:
+            partitioning = ds.partitioning(pa.schema([("run", pa.string())]), flavor="hive")
+            dataset = ds.dataset(STORE_DIR, format="parquet", partitioning=partitioning)
+            schemas = [fragment.physical_schema for fragment in dataset.get_fragments()]
+            schema = pa.unify_schemas(schemas + [partitioning.schema], promote_options="permissive")
+            _dataset = ds.dataset(STORE_DIR, schema=schema, format="parquet", partitioning=partitioning)
+            _dataset_key = key
+        return _dataset
+
+
+def scan(columns: list = None, runs: list = None, filters: list = None) -> pd.DataFrame:
+    """Читает из хранилища только нужные колонки и запуски; фильтры проталкиваются в Parquet."""
+    if not ingested_runs():
+        return pd.DataFrame()
+    dataset = get_dataset()
+    names = dataset.schema.names
+
+    expr = None
+    if runs is not None:
+        expr = ds.field("run").isin(list(runs))
+    for col, op, value in filters or []:
+        if col not in names:
+            return pd.DataFrame(columns=columns)
+        cond = ds.field(col).isin(list(value)) if op == "in" else OPERATORS[op](ds.field(col), value)
+        expr = cond if expr is None else expr & cond
+
+    cols = None if columns is None else [c for c in columns if c in names]
+    return dataset.to_table(columns=cols, filter=expr).to_pandas()
+
+
+def apply_filters(df: pd.DataFrame, filters: list = None) -> pd.DataFrame:
+    """Те же фильтры для ещё не загруженных в хранилище запусков (по CSV)."""
+    for col, op, value in filters or []:
+        if col not in df.columns:
+            return df.iloc[0:0]
+        df = df[OPERATORS[op](df[col], value)]
+    return df
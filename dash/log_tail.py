@@ -0,0 +1,148 @@
+# Инкрементальное чтение журнала событий запуска: только новые строки с сохранённого смещения
+import json
+import os
+
+from dash import html
+
+from task import STEP_LABELS
+
+MAX_READ_BYTES = 256 * 1024   # сколько байт журнала читаем за один тик
+LOG_MAX_BLOCKS = 50           # сколько последних блоков (тиков) держим на странице
+LOG_BLOCK_LINES = 200         # сколько последних событий показываем из одного блока
+FINAL_EVENTS = ("run_finish", "run_error")
+
+STEP_STYLES = {
+    "E_pot": {"color": "green"},
+    "E_kin": {"color": "red"},
+    "E_total": {"fontWeight": "bold"},
+    "Q": {"color": "orange"},
+}
+SUMMARY_STYLE = {"fontWeight": "bold", "color": "green", "marginTop": "10px"}
+ERROR_STYLE = {"color": "#c62828"}
+
+
+def read_new_lines(path: str, offset: int, max_bytes: int = MAX_READ_BYTES):
+    """Читает целые строки начиная с offset. Возвращает (строки, новое смещение, пропущено байт).
+
+    Если новых данных больше окна чтения, середина пропускается: на экране всё равно
+    остаётся только хвост, а читать нужно не больше max_bytes за тик.
+    """
+    skipped = 0
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        if size - offset > max_bytes:
+            skipped = size - max_bytes - offset
+            offset = size - max_bytes
+        f.seek(offset)
+        data = f.read(max_bytes)
+    if skipped:
+        # Первая строка окна оборвана — начинаем со следующей
+        cut = data.find(b"\n") + 1
+        skipped += cut
+        offset += cut
+        data = data[cut:]
+    end = data.rfind(b"\n")
+    if end < 0:
+        return [], offset, skipped
+    data = data[:end + 1]
+    return data.decode("utf-8", errors="replace").splitlines(), offset + len(data), skipped
+
+
+def read_events(path: str, offset: int):
+    """Новые события журнала, смещение для следующего чтения и число пропущенных байт."""
+    lines, offset, skipped = read_new_lines(path, offset)
+    events = []
+    if skipped:
+        events.append({"type": "skipped", "bytes": skipped})
+    for line in lines:
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            continue
+    return events, offset
+
+
+def render_step(name: str, value: float, label: str = None):
+    return html.Div(f"{label or STEP_LABELS.get(name, name)}: {value:.4f}",
+                    style={"marginLeft": "15px", **STEP_STYLES.get(name, {})})
+
+
+def render_params(params: dict):
+    text = ", ".join(f"{k}={v}" for k, v in params.items())
+    return html.Div(f"Параметры: {text}", style={"marginLeft": "15px"})
+
+
+def render_event(event: dict) -> list:
+    kind = event.get("type")
+    series = event.get("series")
+    if kind == "run_start":
+        return [html.Div(f"Всего серий: {event['total']}", style=SUMMARY_STYLE)]
+    if kind == "run_resume":
+        return [html.Div(f"Запуск продолжен после перезапуска: рассчитано {event['done']}, осталось {event['remaining']}",
+                         style=SUMMARY_STYLE)]
+    if kind == "executor":
+        return [html.Div(f"Исполнитель: {event['executor']}, воркеров: {event['workers']}, блоков: {event['chunks'] or '—'}")]
+    if kind == "series_start":
+        return [html.Div(f"=== Серия {series} ===", style={"fontWeight": "bold", "marginTop": "10px"})]
+    if kind == "params":
+        return [render_params(event["params"])]
+    if kind == "step":
+        return [render_step(event["name"], event["value"], event.get("label"))]
+    if kind == "series_finish":
+        out = []
+        # Журналы прежних версий: серия пакета одним событием с параметрами и результатами
+        if "params" in event:
+            out.append(html.Div(f"=== Серия {series} ===", style={"fontWeight": "bold", "marginTop": "10px"}))
+            out.append(render_params(event["params"]))
+            out.extend(render_step(k, v) for k, v in event.get("results", {}).items())
+        duration = f" за {event['duration']:.2f} с" if event.get("duration") is not None else ""
+        out.append(html.Div(f"Серия {series} завершена{duration}.", style={"marginLeft": "15px"}))
+        return out
+    if kind == "series_done":
+        # Пакет серий одним итогом; ошибки отдельных серий приходят своими событиями
+        failed = f", с ошибками {event['failed']}" if event.get("failed") else ""
+        duration = f" за {event['duration']:.2f} с" if event.get("duration") is not None else ""
+        return [html.Div(f"Серии {event['first']}–{event['last']}: рассчитано {event['calculated']}{failed}{duration}",
+                         style={"marginLeft": "15px"})]
+    if kind == "cache_hit":
+        return [html.Div("Результат взят из кэша", style={"marginLeft": "15px", "color": "#1565c0"})]
+    if kind == "series_error":
+        return [html.Div(f"[ОШИБКА] Серия {series}: невозможно вычислить серию: {event['error']}", style=ERROR_STYLE)]
+    if kind == "chunk_done":
+        duration = f" за {event['duration']:.2f} с" if event.get("duration") is not None else ""
+        of = f"/{event['chunks']}" if event.get("chunks") else ""
+        return [html.Div(f"[{event['worker']}] блок {event['chunk']}{of}: "
+                         f"серии {event['first']}–{event['last']} рассчитаны{duration}", style={"color": "#1565c0"})]
+    if kind == "chunk_error":
+        return [html.Div(f"Ошибка в блоке {event['chunk']}: {event['error']}", style=ERROR_STYLE)]
+    if kind == "run_summary":
+        return [html.Div(f"Рассчитано серий: {event['calculated']}, с ошибками: {event['failed']}", style=SUMMARY_STYLE)]
+    if kind == "cache_report":
+        total = event["hits"] + event["misses"]
+        share = f" ({event['hits'] / total:.0%})" if total else ""
+        return [html.Div(f"Из кэша результатов: {event['hits']} из {total} серий{share}", style={"color": "#1565c0"})]
+    if kind == "run_finish":
+        return [html.Div(f"ВСЕ РАСЧЕТЫ ЗАВЕРШЕНЫ за {event['duration']:.1f} с", style=SUMMARY_STYLE)]
+    if kind == "profile":
+        return [html.Div(f"Профиль запуска сохранён: {event['path']}", style={"color": "#888"})]
+    if kind == "profile_skipped":
+        return [html.Div(f"Профиль не снят: {event['reason']}", style={"color": "#888"})]
+    if kind == "skipped":
+        return [html.Div(f"… пропущено {event['bytes'] // 1024} КБ журнала", style={"color": "#888"})]
+    if kind == "run_error":
+        return [html.Div(f"Ошибка: {event['error']}", style=ERROR_STYLE)]
+    return [html.Div(json.dumps(event, ensure_ascii=False), style={"color": "#888"})]
+
+
+def render_block(events: list):
+    """Один блок журнала на тик; из длинного блока показываем только хвост."""
+    if not events:
+        return None
+    children = []
+    skipped = len(events) - LOG_BLOCK_LINES
+    if skipped > 0:
+        children.append(html.Div(f"… пропущено событий: {skipped}", style={"color": "#888"}))
+        events = events[skipped:]
+    for event in events:
+        children.extend(render_event(event))
+    return html.Div(children)
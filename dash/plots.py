@@ -0,0 +1,128 @@
+# Построение графиков истории для больших объёмов данных
+import numpy as np
+import plotly.graph_objs as go
+
+from formulas import DEFAULT_MODEL, Model
+
+PLOT_ROW_THRESHOLD = 20_000   # больше строк — прореживаем на сервере
+PLOT_BUCKETS = 2000           # корзин по оси X для min/max-прореживания (~ ширина графика в пикселях)
+PLOT_3D_BINS = 60             # сетка агрегации для 3D-графика
+
+
+
+def line_plots(model: Model) -> dict:
+    """Линейные графики модели (выходы с ключом plot): ключ -> (x, y, цвет, заголовок, подпись оси X)."""
+    plots = {}
+    for name, spec in model.specs.items():
+        plot = spec.get("plot")
+        if plot:
+            x = plot["x"]
+            plots[name] = (x, name, plot.get("color", "blue"), plot.get("title", f"{name} от {x}"), plot.get("x_title", x))
+    return plots
+
+
+def surface_plot(model: Model):
+    """3D-график модели (выход с ключом surface): (x, y, z) или None."""
+    for name, spec in model.specs.items():
+        surface = spec.get("surface")
+        if surface:
+            return surface["x"], surface["y"], name
+    return None
+
+
+LINE_PLOTS = line_plots(DEFAULT_MODEL)
+
+
+def finite(*arrays):
+    mask = np.logical_and.reduce([np.isfinite(a) for a in arrays])
+    return [a[mask] for a in arrays]
+
+
+def decimate_minmax(x: np.ndarray, y: np.ndarray, buckets: int = PLOT_BUCKETS):
+    """Сортирует точки по X и оставляет в каждой корзине X только минимум и максимум Y."""
+    if len(x) <= 2 * buckets:
+        order = np.argsort(x, kind="stable")
+        return x[order], y[order]
+
+    lo, hi = x.min(), x.max()
+    bucket = np.minimum(((x - lo) / ((hi - lo) or 1) * buckets).astype(np.int64), buckets - 1)
+    order = np.lexsort((y, bucket))
+    sorted_bucket = bucket[order]
+    first = np.flatnonzero(np.r_[True, sorted_bucket[1:] != sorted_bucket[:-1]])
+    last = np.r_[first[1:] - 1, len(order) - 1]
+
+    keep = np.unique(np.r_[order[first], order[last]])
+    keep = keep[np.argsort(x[keep], kind="stable")]
+    return x[keep], y[keep]
+
+
+def bin_3d(x: np.ndarray, y: np.ndarray, z: np.ndarray, bins: int = PLOT_3D_BINS):
+    """Агрегирует точки по сетке (x, y): центры ячеек, среднее z и число точек в ячейке."""
+    def edges(a):
+        lo, hi = a.min(), a.max()
+        idx = np.minimum(((a - lo) / ((hi - lo) or 1) * bins).astype(np.int64), bins - 1)
+        return idx, lo + (np.arange(bins) + 0.5) * ((hi - lo) or 1) / bins
+
+    xi, cx = edges(x)
+    yi, cy = edges(y)
+    key = xi * bins + yi
+    counts = np.bincount(key, minlength=bins * bins)
+    sums = np.bincount(key, weights=z, minlength=bins * bins)
+    cells = np.flatnonzero(counts)
+    return cx[cells // bins], cy[cells % bins], sums[cells] / counts[cells], counts[cells]
+
+
+def scatter3d_figure(df, param_x: str, param_y: str, param_z: str = "E_total"):
+    x, y, z = finite(*(df[c].to_numpy(dtype=float) for c in (param_x, param_y, param_z)))
+    hover = f"{param_x}: %{{x:.2f}}<br>{param_y}: %{{y:.2f}}<br>{param_z}: %{{z:.2f}}"
+
+    fig = go.Figure()
+    if len(x) > PLOT_ROW_THRESHOLD:
+        # Много точек: показываем среднее z по ячейкам сетки, размер — число точек
+        cx, cy, mean, counts = bin_3d(x, y, z)
+        size = 3 + 9 * np.sqrt(counts / counts.max())
+        fig.add_trace(go.Scatter3d(
+            x=cx, y=cy, z=mean, mode='markers', customdata=counts,
+            marker=dict(size=size, color=mean, colorscale='Viridis', opacity=0.7, colorbar=dict(title=param_z)),
+            hovertemplate=f"<b>{hover}<br>точек: %{{customdata}}</b><extra></extra>"
+        ))
+        title = f"3D: среднее {param_z} от {param_x} и {param_y} ({len(x)} точек, {len(cx)} ячеек)"
+    else:
+        fig.add_trace(go.Scatter3d(
+            x=x, y=y, z=z, mode='markers',
+            marker=dict(size=8, color=z, colorscale='Viridis', opacity=0.7, colorbar=dict(title=param_z)),
+            hovertemplate=f"<b>{hover}</b><extra></extra>"
+        ))
+        title = f"3D: {param_z} от {param_x} и {param_y}"
+    fig.update_layout(
+        title=title,
+        scene=dict(xaxis_title=param_x, yaxis_title=param_y, zaxis_title=param_z),
+        height=500
+    )
+    return fig
+
+
+def line_figure(df, key: str, x_range: list = None, plots: dict = None):
+    """Линейный график на WebGL; больше PLOT_ROW_THRESHOLD точек — min/max по корзинам X."""
+    x_col, y_col, color, title, x_title = (plots or LINE_PLOTS)[key]
+    x, y = finite(df[x_col].to_numpy(dtype=float), df[y_col].to_numpy(dtype=float))
+    total = len(x)
+    decimated = total > PLOT_ROW_THRESHOLD
+    if decimated:
+        x, y = decimate_minmax(x, y)
+    else:
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=x, y=y, mode='lines' if decimated else 'markers+lines',
+        marker=dict(size=8, opacity=0.7, color=color),
+        line=dict(width=2, color=color)
+    ))
+    if decimated:
+        title = f"{title} ({len(x)} из {total} точек)"
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_col, height=400, uirevision=key)
+    if x_range is not None:
+        fig.update_xaxes(range=x_range)
+    return fig
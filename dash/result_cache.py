@@ -0,0 +1,126 @@
+# Общий для запусков и процессов кэш результатов серий (SQLite), адресуемый содержимым строки
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+TRIM_EVERY = 1000     # новых записей между проверками размера кэша
+SQL_BATCH = 500       # ключей в одном запросе IN (...)
+
+
+def row_hashes(inputs: dict, columns: list) -> np.ndarray:
+    """64-битный хэш каждой строки входов (в порядке columns); -0.0 и 0 дают один ключ."""
+    frame = pd.DataFrame({key: np.atleast_1d(np.asarray(inputs[key], dtype=float)) + 0.0 for key in columns})
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64)
+
+
+class ResultCache:
+    """Выходные величины серий по ключу (версия модели, хэш нормализованной строки входов).
+
+    Входы модели — это параметры и константы, версия меняется вместе с формулами,
+    поэтому старые результаты после правки YAML не подхватываются. Файл общий для
+    всех запусков и воркеров пула процессов (WAL); сверх max_rows вытесняются записи,
+    к которым дольше всего не обращались.
+    """
+
+    def __init__(self, path: str, max_rows: int = 100_000):
+        self.path = path
+        self.max_rows = max_rows
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.written = 0
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = self.connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "version TEXT NOT NULL, hash INTEGER NOT NULL, outputs TEXT NOT NULL, accessed REAL NOT NULL, "
+            "PRIMARY KEY (version, hash)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def connect(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def get_many(self, version: str, hashes: np.ndarray) -> dict:
+        """Найденные записи: хэш -> список выходных величин в порядке model.outputs."""
+        found = {}
+        keys = list(dict.fromkeys(hashes.tolist()))
+        if not keys:
+            return found
+        conn = self.connect()
+        # Чтение и отметка времени обращения — одна транзакция, а не коммит на каждую строку
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for start in range(0, len(keys), SQL_BATCH):
+                batch = keys[start:start + SQL_BATCH]
+                marks = ",".join("?" * len(batch))
+                rows = conn.execute(f"SELECT hash, outputs FROM results WHERE version = ? AND hash IN ({marks})",
+                                    [version, *batch]).fetchall()
+                found.update((h, json.loads(outputs)) for h, outputs in rows)
+            if found:
+                now = time.time()
+                conn.executemany("UPDATE results SET accessed = ? WHERE version = ? AND hash = ?",
+                                 [(now, version, h) for h in found])
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return found
+
+    def put_many(self, version: str, hashes: np.ndarray, outputs: list):
+        """outputs — массивы выходных величин (в порядке model.outputs), по элементу на хэш."""
+        if not len(hashes):
+            return
+        now = time.time()
+        rows = [(version, h, json.dumps(values), now)
+                for h, values in zip(hashes.tolist(), np.column_stack(outputs).tolist())]
+        conn = self.connect()
+        conn.execute("BEGIN")
+        conn.executemany("INSERT OR REPLACE INTO results (version, hash, outputs, accessed) VALUES (?, ?, ?, ?)", rows)
+        conn.execute("COMMIT")
+        with self.lock:
+            self.written += len(rows)
+            trim = self.written >= TRIM_EVERY
+            if trim:
+                self.written = 0
+        if trim:
+            self.trim()
+
+    def trim(self):
+        conn = self.connect()
+        conn.execute(
+            "DELETE FROM results WHERE (version, hash) IN ("
+            "SELECT version, hash FROM results ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.max_rows,),
+        )
+
+    def __len__(self):
+        return self.connect().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def __reduce__(self):
+        # В пул процессов уходит путь к файлу, соединение открывается в воркере
+        return get_cache, (self.path, self.max_rows)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(path: str, max_rows: int) -> ResultCache:
+    """Один объект кэша на файл в процессе (соединения — по потокам)."""
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None or cache.max_rows != max_rows:
+            cache = _caches[path] = ResultCache(path, max_rows)
+        return cache
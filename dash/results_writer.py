@@ -0,0 +1,122 @@
+# Дозапись results.csv без перечитывания файла
+import csv
+import io
+import os
+import threading
+
+import pandas as pd
+
+import metrics
+
+WRITE_SECONDS = metrics.histogram("nir_results_write_seconds", "Запись пакета серий в results.csv")
+BATCH_SIZE = 1           # строк write_row между сбросами на диск; по умолчанию каждая строка сразу с fsync
+REPAIR_BLOCK = 65536     # байт, читаемых за раз при поиске конца последней целой строки
+
+
+class ResultsWriter:
+    """Пишет строки результатов в results.csv только дозаписью.
+
+    По умолчанию каждая строка write_row сразу уходит в файл с fsync: посчитанная
+    серия не теряется при падении процесса. batch_size > 1 включает буфер — строки
+    сбрасываются блоками, и при падении пропадает несброшенный остаток (до
+    batch_size - 1 строк). Каждый сброс — одна запись целых строк с fsync, поэтому
+    в файле не бывает оборванных строк. write_frame, offset для журнала и закрытие
+    сбрасывают буфер сразу.
+    """
+
+    def __init__(self, path: str, columns: list, batch_size: int = BATCH_SIZE):
+        self.path = path
+        self.columns = list(columns)
+        self.batch_size = max(1, batch_size)
+        self.buffer = []
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self.repair()
+        self.file = open(self.path, "a", newline="", encoding="utf-8")
+        if self.file.tell() == 0:
+            self.file.write(",".join(self.columns) + "\n")
+            self.sync()
+        else:
+            # Продолжаем существующий файл с его порядком колонок
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.columns = next(csv.reader(f))
+
+    def repair(self):
+        """Отрезает недописанную последнюю строку, оставшуюся после падения процесса.
+
+        Конец последней целой строки ищется с конца файла блоками по REPAIR_BLOCK байт;
+        файл без единого перевода строки не содержит даже заголовка и обнуляется.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            end = size
+            while end > 0:
+                start = max(0, end - REPAIR_BLOCK)
+                f.seek(start)
+                cut = f.read(end - start).rfind(b"\n")
+                if cut >= 0:
+                    f.truncate(start + cut + 1)
+                    return
+                end = start
+            f.truncate(0)
+
+    def write_row(self, row: dict):
+        with self.lock:
+            self.buffer.append([row.get(c, "") for c in self.columns])
+            if len(self.buffer) >= self.batch_size:
+                self.flush_locked()
+
+    def write_frame(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        with self.lock:
+            self.flush_locked()
+            with metrics.timer(WRITE_SECONDS):
+                data = df.reindex(columns=self.columns).to_csv(header=False, index=False, lineterminator="\n")
+                self.file.write(data)
+                self.sync()
+
+    def flush(self):
+        with self.lock:
+            self.flush_locked()
+
+    def offset(self) -> int:
+        """Размер файла со всеми записанными строками (для журнала досчёта)."""
+        with self.lock:
+            self.flush_locked()
+            return self.file.tell()
+
+    def flush_locked(self):
+        if not self.buffer:
+            return
+        out = io.StringIO()
+        csv.writer(out, lineterminator="\n").writerows(self.buffer)
+        self.file.write(out.getvalue())
+        self.buffer.clear()
+        self.sync()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        with self.lock:
+            if self.file.closed:
+                return
+            # Каждая запись в файл уже заканчивается fsync, повторная синхронизация не нужна
+            self.flush_locked()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
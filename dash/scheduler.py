@@ -0,0 +1,158 @@
+# Состояние сессий и очередь запусков: ограниченное число одновременных расчётов на сервер
+import heapq
+import itertools
+import threading
+import time
+import uuid
+
+from formulas import DEFAULT_MODEL
+from series_buffer import SeriesBuffer
+
+RUN_SLOTS = 2             # запусков, которые считаются одновременно
+RUN_QUEUE_LIMIT = 50      # запусков в очереди и в работе на сервер; сверх — отказ
+RUN_SESSION_LIMIT = 5     # то же на одну сессию
+RUN_POLICY = "priority"   # priority — выше приоритет раньше, при равных по порядку постановки; fifo — только по порядку
+SESSION_TTL = 12 * 3600   # секунд без обращений, после которых состояние сессии забывается
+KEEP_FINISHED = 200
+DEFAULT_RATE = 5000.0     # серий в секунду для оценки ETA, пока нет завершённых запусков
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Session:
+    """Загруженная конфигурация одной вкладки браузера: YAML, модель формул, параметры и серии."""
+
+    def __init__(self):
+        self.config = {}
+        self.model = DEFAULT_MODEL
+        self.parameters = []
+        self.series = SeriesBuffer([])
+        self.seen = time.time()
+
+
+class Run:
+    def __init__(self, folder: str, session: str, total: int, fn, args: tuple, priority: int = 0):
+        self.folder = folder
+        self.session = session
+        self.total = total
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.status = "queued"      # queued | running | done | failed
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+
+
+class RunScheduler:
+    """Очередь запусков с RUN_SLOTS потоками-исполнителями и состояние сессий.
+
+    Сессия — это вкладка браузера (session-id в dcc.Store): у каждой своя загруженная
+    конфигурация, запуски разных сессий не мешают друг другу. ETA оценивается по
+    средней скорости (серий в секунду) уже завершённых запусков.
+    """
+
+    def __init__(self, slots: int = RUN_SLOTS, policy: str = RUN_POLICY,
+                 limit: int = RUN_QUEUE_LIMIT, session_limit: int = RUN_SESSION_LIMIT):
+        if policy not in ("fifo", "priority"):
+            raise ValueError(f"Unknown run policy: {policy}")
+        self.slots = slots
+        self.policy = policy
+        self.limit = limit
+        self.session_limit = session_limit
+        self.sessions = {}
+        self.runs = {}              # folder -> Run, включая завершённые (последние KEEP_FINISHED)
+        self.queue = []             # куча (ключ порядка, Run)
+        self.order = itertools.count()
+        self.rate = None            # серий в секунду, скользящее среднее
+        self.lock = threading.Lock()
+        self.ready = threading.Condition(self.lock)
+        for i in range(slots):
+            threading.Thread(target=self.work, name=f"run-slot-{i + 1}", daemon=True).start()
+
+    def new_session_id(self) -> str:
+        return uuid.uuid4().hex
+
+    def session(self, session_id: str) -> Session:
+        """Состояние сессии; неизвестная сессия (или после перезапуска сервера) начинается с пустой."""
+        now = time.time()
+        with self.lock:
+            for sid in [sid for sid, s in self.sessions.items() if now - s.seen > SESSION_TTL]:
+                del self.sessions[sid]
+            state = self.sessions.get(session_id)
+            if state is None:
+                state = self.sessions[session_id] = Session()
+            state.seen = now
+            return state
+
+    def submit(self, folder: str, session: str, total: int, fn, args: tuple = (), priority: int = 0) -> Run:
+        """Ставит запуск в очередь; fn(*args) выполняется, когда освободится слот."""
+        run = Run(folder, session, total, fn, args, priority)
+        with self.lock:
+            active = [r for r in self.runs.values() if r.status in ("queued", "running")]
+            if len(active) >= self.limit:
+                raise QueueFull(f"Очередь запусков заполнена ({self.limit})")
+            if session is not None and sum(r.session == session for r in active) >= self.session_limit:
+                raise QueueFull(f"У сессии уже {self.session_limit} запусков в очереди и в работе")
+            self.runs[folder] = run
+            rank = -priority if self.policy == "priority" else 0
+            heapq.heappush(self.queue, ((rank, next(self.order)), run))
+            self.trim()
+            self.ready.notify()
+        return run
+
+    def work(self):
+        while True:
+            with self.lock:
+                while not self.queue:
+                    self.ready.wait()
+                _, run = heapq.heappop(self.queue)
+                run.status = "running"
+                run.started = time.time()
+            try:
+                run.fn(*run.args)
+                status = "done"
+            except Exception:
+                status = "failed"
+            with self.lock:
+                run.status = status
+                run.finished = time.time()
+                elapsed = run.finished - run.started
+                if status == "done" and run.total and elapsed > 0:
+                    rate = run.total / elapsed
+                    self.rate = rate if self.rate is None else 0.7 * self.rate + 0.3 * rate
+
+    def running(self) -> int:
+        with self.lock:
+            return sum(r.status == "running" for r in self.runs.values())
+
+    def trim(self):
+        finished = [folder for folder, r in self.runs.items() if r.status in ("done", "failed")]
+        for folder in finished[:max(0, len(finished) - KEEP_FINISHED)]:
+            del self.runs[folder]
+
+    def status(self, folder: str):
+        """{"status", "position" (1 — следующий), "eta" (секунд до завершения)} или None."""
+        now = time.time()
+        with self.lock:
+            run = self.runs.get(folder)
+            if run is None:
+                return None
+            rate = self.rate or DEFAULT_RATE
+            if run.status == "running":
+                return {"status": "running", "position": 0, "eta": max(0.0, run.total / rate - (now - run.started))}
+            if run.status != "queued":
+                return {"status": run.status, "position": 0, "eta": 0.0}
+
+            # Ждём, пока освободятся слоты: оставшееся у идущих запусков и всё, что в очереди раньше
+            ahead = sorted(self.queue)
+            position = next(i for i, (_, r) in enumerate(ahead) if r is run) + 1
+            busy = sorted(max(0.0, r.total / rate - (now - r.started))
+                          for r in self.runs.values() if r.status == "running")
+            slots = busy + [0.0] * (self.slots - len(busy))
+            heapq.heapify(slots)
+            for _, r in ahead[:position - 1]:
+                heapq.heappush(slots, heapq.heappop(slots) + r.total / rate)
+            return {"status": "queued", "position": position, "eta": heapq.heappop(slots) + run.total / rate}
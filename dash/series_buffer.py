@@ -0,0 +1,117 @@
+# Серии сессии на сервере: по массиву NumPy на параметр, в браузер уходит только видимая страница
+import io
+import threading
+
+import numpy as np
+import pandas as pd
+import yaml
+
+INITIAL_CAPACITY = 64
+
+
+class SeriesBuffer:
+    """Список серий в колоночном виде с запасом ёмкости (удвоение, как у list).
+
+    Добавление серии пишет по числу в каждый массив, без пересборки DataFrame;
+    frame() отдаёт копию заполненной части для запуска расчёта.
+    """
+
+    def __init__(self, columns: list, capacity: int = INITIAL_CAPACITY):
+        self.columns = list(columns)
+        self.data = {c: np.empty(capacity) for c in self.columns}
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return self.size
+
+    def reserve(self, size: int):
+        capacity = len(next(iter(self.data.values()))) if self.data else 0
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2, INITIAL_CAPACITY)
+        for c, values in self.data.items():
+            grown = np.empty(capacity)
+            grown[:self.size] = values[:self.size]
+            self.data[c] = grown
+
+    def append(self, row: dict) -> dict:
+        """Добавляет серию; возвращает её строку в том виде, в каком она уйдёт в таблицу."""
+        with self.lock:
+            self.reserve(self.size + 1)
+            for c in self.columns:
+                value = row.get(c)
+                self.data[c][self.size] = np.nan if value is None else float(value)
+            self.size += 1
+            return self.row(self.size - 1)
+
+    def extend(self, frame: pd.DataFrame):
+        """Добавляет серии блоком (импорт): колонки уже проверены и приведены к числам."""
+        with self.lock:
+            self.reserve(self.size + len(frame))
+            for c in self.columns:
+                self.data[c][self.size:self.size + len(frame)] = frame[c].to_numpy(dtype=float)
+            self.size += len(frame)
+
+    def set(self, index: int, column: str, value):
+        with self.lock:
+            if 0 <= index < self.size and column in self.data:
+                self.data[column][index] = np.nan if value is None else float(value)
+
+    def clear(self):
+        with self.lock:
+            self.size = 0
+
+    def row(self, index: int) -> dict:
+        return {"series": index + 1, **{c: to_cell(self.data[c][index]) for c in self.columns}}
+
+    def page(self, page: int, page_size: int) -> list:
+        """Строки одной страницы таблицы (номер серии — в колонке series)."""
+        with self.lock:
+            start = max(0, page) * page_size
+            return [self.row(i) for i in range(start, min(start + page_size, self.size))]
+
+    def page_count(self, page_size: int) -> int:
+        return max(1, -(-self.size // page_size))
+
+    def frame(self) -> pd.DataFrame:
+        with self.lock:
+            return pd.DataFrame({c: self.data[c][:self.size].copy() for c in self.columns})
+
+
+def to_cell(value: float):
+    return None if np.isnan(value) else float(value)
+
+
+def parse_series(content: bytes, filename: str) -> pd.DataFrame:
+    """Серии из CSV (заголовок — имена параметров) или YAML (список словарей либо {series: [...]})."""
+    if filename.lower().endswith((".yaml", ".yml")):
+        data = yaml.safe_load(content.decode("utf-8"))
+        if isinstance(data, dict):
+            data = data.get("series")
+        if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+            raise ValueError("В YAML ожидается список серий (словарей параметр: значение) или ключ series")
+        return pd.DataFrame(data)
+    return pd.read_csv(io.BytesIO(content))
+
+
+def prepare_import(df: pd.DataFrame, columns: list, defaults: dict) -> tuple:
+    """Приводит импортируемые серии к колонкам сессии.
+
+    Отсутствующие колонки заполняются значениями по умолчанию (default параметра,
+    value константы). Возвращает (DataFrame, список пропущенных неизвестных колонок).
+    """
+    unknown = [c for c in df.columns if c not in columns and c != "series"]
+    out = pd.DataFrame(index=df.index)
+    for c in columns:
+        if c in df.columns:
+            values = pd.to_numeric(df[c], errors="coerce")
+            bad = values.isna() & df[c].notna()
+            if bad.any():
+                raise ValueError(f"Колонка {c}: не число в строке {int(bad.to_numpy().argmax()) + 1}")
+            out[c] = values.fillna(defaults[c]) if defaults.get(c) is not None else values
+        elif defaults.get(c) is not None:
+            out[c] = float(defaults[c])
+        else:
+            raise ValueError(f"Нет колонки {c} и значения по умолчанию для неё")
+    return out, unknown
@@ -0,0 +1,142 @@
+# Генерация свипов по диапазонам из param_config.yaml: сетка, латинский гиперкуб, Соболь
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+SWEEP_METHODS = {
+    "grid": "Полная сетка",
+    "lhs": "Латинский гиперкуб",
+}
+# Соболь — из scipy.stats.qmc; без scipy метод не предлагается
+if importlib.util.find_spec("scipy") is not None:
+    SWEEP_METHODS["sobol"] = "Последовательность Соболя"
+DEFAULT_MAX_POINTS = 10_000_000
+DEFAULT_LEVELS = 10       # уровней на параметр, предлагаемых в форме свипа
+FEISTEL_ROUNDS = 4
+
+
+class SweepSpace:
+    """Диапазоны параметров (min, max, step) и значения констант из конфигурации."""
+
+    def __init__(self, yaml_config: dict, levels: int = None):
+        params = yaml_config.get("parameters", {}) or {}
+        constants = yaml_config.get("constants", {}) or {}
+
+        self.keys = list(params.keys())
+        self.low = np.array([float(p.get("min", 0)) for p in params.values()])
+        self.high = np.array([float(p.get("max", 100)) for p in params.values()])
+        self.step = np.array([float(p.get("step", 1)) for p in params.values()])
+        self.constants = {key: c.get("value") for key, c in constants.items()}
+
+        # Уровни сетки: levels равномерных точек на параметр; levels=None — по шагу слайдера
+        # (такая сетка обычно огромна, её ограничивает sweep.max_points)
+        if levels:
+            self.levels = [np.linspace(lo, hi, int(levels)) for lo, hi in zip(self.low, self.high)]
+        else:
+            self.levels = [np.round(np.arange(lo, hi + st / 2, st), 10)
+                           for lo, hi, st in zip(self.low, self.high, self.step)]
+
+    def grid_size(self) -> int:
+        return int(np.prod([len(level) for level in self.levels], dtype=object))
+
+    def frame(self, values: np.ndarray, start: int) -> pd.DataFrame:
+        df = pd.DataFrame(values, columns=self.keys, index=pd.RangeIndex(start, start + len(values)))
+        for key, value in self.constants.items():
+            df[key] = value
+        return df
+
+
+def grid_chunks(space: SweepSpace, chunk_size: int):
+    """Полный факторный план; точки вычисляются из номера строки, сетка целиком не строится."""
+    shape = [len(level) for level in space.levels]
+    total = space.grid_size()
+    for start in range(0, total, chunk_size):
+        idx = np.unravel_index(np.arange(start, min(start + chunk_size, total)), shape)
+        values = np.column_stack([level[i] for level, i in zip(space.levels, idx)])
+        yield space.frame(values, start)
+
+
+def mix(x: np.ndarray) -> np.ndarray:
+    """Перемешивание битов uint64 (финализатор splitmix64)."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def permute(index: np.ndarray, n: int, keys: np.ndarray) -> np.ndarray:
+    """Псевдослучайная перестановка 0..n-1, вычисляемая по номеру элемента.
+
+    Сеть Фейстеля на 2·half битах — перестановка степени двойки; значения ≥ n
+    прогоняются через неё повторно, пока не попадут в 0..n-1.
+    """
+    half = max(1, (int(n - 1).bit_length() + 1) // 2)
+    shift, mask = np.uint64(half), np.uint64((1 << half) - 1)
+    x = index.astype(np.uint64)
+    out = np.empty_like(x)
+    pending = np.arange(len(x))
+    while len(pending):
+        left, right = x >> shift, x & mask
+        for key in keys:
+            left, right = right, left ^ (mix(right ^ key) & mask)
+        x = (left << shift) | right
+        done = x < np.uint64(n)
+        out[pending[done]] = x[done]
+        pending, x = pending[~done], x[~done]
+    return out.astype(np.int64)
+
+
+def lhs_chunks(space: SweepSpace, n: int, chunk_size: int, seed: int = None):
+    """Латинский гиперкуб: по каждому параметру ровно одна точка в каждом из n интервалов.
+
+    Интервалы точек блока берутся из перестановки, вычисляемой по номерам точек,
+    поэтому память — на блок, а не на n точек по каждому параметру.
+    """
+    rng = np.random.default_rng(seed)
+    keys = [rng.integers(0, 2 ** 64, size=FEISTEL_ROUNDS, dtype=np.uint64) for _ in space.keys]
+    with np.errstate(over="ignore"):
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            index = np.arange(start, stop)
+            u = np.column_stack([(permute(index, n, k) + rng.random(stop - start)) / n for k in keys])
+            yield space.frame(space.low + u * (space.high - space.low), start)
+
+
+def sobol_chunks(space: SweepSpace, n: int, chunk_size: int, seed: int = None):
+    """Последовательность Соболя (scipy.stats.qmc); точки берутся из генератора блоками."""
+    try:
+        from scipy.stats import qmc
+    except ImportError:
+        raise ImportError("Для свипа по Соболю нужен scipy")
+    sampler = qmc.Sobol(d=len(space.keys), scramble=True, seed=seed)
+
+    def chunks():
+        for start in range(0, n, chunk_size):
+            u = sampler.random(min(chunk_size, n - start))
+            yield space.frame(space.low + u * (space.high - space.low), start)
+    return chunks()
+
+
+def sweep_chunks(yaml_config: dict, method: str, chunk_size: int, samples: int = None,
+                 levels: int = None, seed: int = None):
+    """Возвращает (число точек, ленивый итератор блоков DataFrame)."""
+    space = SweepSpace(yaml_config, levels)
+    if not space.keys:
+        raise ValueError("В конфигурации нет параметров для свипа")
+    max_points = int((yaml_config.get("sweep", {}) or {}).get("max_points", DEFAULT_MAX_POINTS))
+
+    if method not in SWEEP_METHODS:
+        raise ValueError(f"Unknown sweep method: {method}")
+    if method == "grid":
+        total = space.grid_size()
+        chunks = grid_chunks(space, chunk_size)
+    else:
+        if not samples or samples < 1:
+            raise ValueError("Укажите число точек")
+        total = int(samples)
+        make = lhs_chunks if method == "lhs" else sobol_chunks
+        chunks = make(space, total, chunk_size, seed)
+
+    if total > max_points:
+        raise ValueError(f"Свип из {total} точек больше лимита sweep.max_points={max_points}")
+    return total, chunks
@@ -0,0 +1,105 @@
+# Серверная постраничная выдача для DataTable: фильтр, сортировка, страница
+import re
+import threading
+
+import pandas as pd
+
+# Операторы языка filter_query DataTable -> операторы фильтров истории
+OPERATOR_ALIASES = {
+    "=": "==", "eq": "==",
+    "!=": "!=", "ne": "!=",
+    ">": ">", "gt": ">",
+    ">=": ">=", "ge": ">=",
+    "<": "<", "lt": "<",
+    "<=": "<=", "le": "<=",
+    "contains": "contains",
+    "datestartswith": "startswith",
+}
+
+FILTER_PART = re.compile(
+    r"^\s*\{(?P<col>[^}]+)\}\s+(?P<op>[is]?(?:>=|<=|!=|<|>|=|eq|ne|lt|le|gt|ge|contains|datestartswith))\s+(?P<value>.+?)\s*$"
+)
+
+
+def parse_value(text: str):
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "'\"`":
+        return text[1:-1].replace("\\" + text[0], text[0])
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def parse_filter(filter_query: str) -> list:
+    """'{m} > 50 && {run} contains "2024"' -> [("m", ">", 50.0), ("run", "contains", "2024")]"""
+    filters = []
+    for part in (filter_query or "").split(" && "):
+        match = FILTER_PART.match(part)
+        if not match:
+            continue
+        op = match["op"]
+        if op[0] in "is" and op[1:] in OPERATOR_ALIASES:
+            op = op[1:]
+        filters.append((match["col"], OPERATOR_ALIASES[op], parse_value(match["value"])))
+    return filters
+
+
+def predicate(df: pd.DataFrame, col: str, op: str, value):
+    """Векторная маска строк для одного условия."""
+    column = df[col]
+    if op == "contains":
+        return column.astype(str).str.contains(str(value), regex=False, na=False)
+    if op == "startswith":
+        return column.astype(str).str.startswith(str(value), na=False)
+    if isinstance(value, float) and not pd.api.types.is_numeric_dtype(column):
+        column = pd.to_numeric(column, errors="coerce")
+    elif isinstance(value, str) and pd.api.types.is_numeric_dtype(column):
+        return pd.Series(op == "!=", index=df.index)
+    return {
+        "==": column.__eq__, "!=": column.__ne__,
+        ">": column.__gt__, ">=": column.__ge__,
+        "<": column.__lt__, "<=": column.__le__,
+    }[op](value).fillna(False)
+
+
+class TableQuery:
+    """Фильтрует и сортирует таблицу один раз на запрос; смена страницы только режет готовый результат."""
+
+    def __init__(self):
+        self.last = None  # (исходный DataFrame, filter_query, sort, результат)
+        self.lock = threading.Lock()
+
+    def select(self, df: pd.DataFrame, filter_query: str, sort_by: list) -> pd.DataFrame:
+        sort = tuple((s["column_id"], s["direction"]) for s in sort_by or [] if s["column_id"] in df.columns)
+        with self.lock:
+            if self.last is not None and self.last[0] is df and self.last[1:3] == (filter_query, sort):
+                return self.last[3]
+
+        result = df
+        mask = None
+        for col, op, value in parse_filter(filter_query):
+            if col not in df.columns:
+                continue
+            cond = predicate(df, col, op, value)
+            mask = cond if mask is None else mask & cond
+        if mask is not None:
+            result = result[mask.to_numpy(dtype=bool)]
+        if sort:
+            result = result.sort_values(
+                [col for col, _ in sort],
+                ascending=[direction == "asc" for _, direction in sort],
+                kind="stable",
+            )
+
+        with self.lock:
+            self.last = (df, filter_query, sort, result)
+        return result
+
+    def page(self, df: pd.DataFrame, filter_query: str, sort_by: list, page_current: int, page_size: int):
+        """Возвращает (строки страницы, число страниц, число строк после фильтра)."""
+        result = self.select(df, filter_query, sort_by)
+        page_current = page_current or 0
+        start = page_current * page_size
+        rows = result.iloc[start:start + page_size].to_dict("records")
+        page_count = max(1, -(-len(result) // page_size))
+        return rows, page_count, len(result)
@@ -1,100 +1,230 @@
 import os
 import time
+import numpy as np
 import pandas as pd
 
+import metrics
+from event_log import EventLog, events_path
+from formulas import DEFAULT_MODEL, Model
+from result_cache import ResultCache, row_hashes
+from results_writer import ResultsWriter
+
+# Входные параметры серии и порядок колонок results.csv модели по умолчанию
+INPUT_PARAMS = DEFAULT_MODEL.inputs
+RESULT_COLUMNS = DEFAULT_MODEL.columns
+
+# Подписи промежуточных величин в журнале
+STEP_LABELS = DEFAULT_MODEL.labels
+
+SERIES_SECONDS = metrics.histogram("nir_series_seconds", "Расчёт одной серии (Task.solve)")
+BATCH_SECONDS = metrics.histogram("nir_batch_compute_seconds", "Расчёт пакета серий (BatchTask.compute)")
+
 
 class Task:
 
-    def __init__(self, params: dict, folder: str, index: int):
+    def __init__(self, params: dict, folder: str, index: int,
+                 writer: ResultsWriter = None, events: EventLog = None, model: Model = None,
+                 cache: ResultCache = None):
         self.params = params
         self.index = index
         self.folder = folder
+        self.writer = writer
+        self.model = model or DEFAULT_MODEL
+        self.events = events
+        self.cache = cache
 
         self.run_path = os.path.join("runs", folder)
         os.makedirs(self.run_path, exist_ok=True)
 
-        self.log_path = os.path.join(self.run_path, "log.txt")
+        self.events_path = events_path(folder)
         self.results_path = os.path.join(self.run_path, "results.csv")
 
-    def log(self, text: str):
-        with open(self.log_path, "a", encoding="utf-8") as f:
-            f.write(text + "\n")
+    def log(self, kind: str, **fields):
+        self.events.emit(kind, series=self.index + 1, **fields)
 
 
     def param(self, key: str, default=None):
         if key not in self.params:
             if default is not None:
                 return default
-            self.log(f"[ОШИБКА] Параметр '{key}' не найден.")
             raise ValueError(f"Missing parameter: {key}")
         return float(self.params[key])
 
     def step(self, name: str, value):
-        self.log(f"   {name}: {value:.4f}")
+        self.log("step", name=name, label=self.model.labels[name], value=value)
         time.sleep(0.4)
 
 
     def solve(self):
-        self.log(f"\nСерия {self.index + 1} ")
+        # Без общего журнала запуска серия пишет в events.jsonl сама
+        if self.events is None:
+            # Свой журнал только на время solve(): закрытый журнал на задаче не остаётся
+            with EventLog(self.events_path, flush_interval=0) as events:
+                self.events = events
+                try:
+                    return self.solve()
+                finally:
+                    self.events = None
+
+        started = time.perf_counter()
+        self.log("series_start")
 
         try:
-            # Основные параметры
-            m = self.param("m")
-            g = self.param("g")
-            h = self.param("h")
-            V = self.param("V")
-            T = self.param("T")
-            
-            # Константы
-            SPECIFIC_HEAT = self.param("SPECIFIC_HEAT")
-
+            inputs = {key: self.param(key) for key in self.model.inputs}
         except Exception as e:
-            self.log(f"[ОШИБКА] Невозможно вычислить серию: {str(e)}")
+            self.log("series_error", error=str(e))
             return
 
-        self.log(f"Параметры: m={m}, g={g}, h={h}, V={V}, T={T}")
-
-        # --- Потенциальная энергия ---
-        E_pot = m * g * h
-        self.step("E_pot (потенциальная)", E_pot)
+        self.log("params", params=inputs)
 
-        # --- Кинетическая энергия ---
-        E_kin = 0.5 * m * V ** 2
-        self.step("E_kin (кинетическая)", E_kin)
-
-        # --- Полная энергия ---
-        E_total = E_pot + E_kin
-        self.step("E_total (полная)", E_total)
+        # Та же строка входов с той же моделью уже считалась — берём результат из кэша
+        key = row_hashes(inputs, self.model.inputs) if self.cache is not None else None
+        cached = self.cache.get_many(self.model.version, key) if key is not None else {}
+        if cached:
+            outputs = dict(zip(self.model.outputs, cached[int(key[0])]))
+            self.log("cache_hit")
+        else:
+            # Выходные величины — по формулам модели, в порядке зависимостей
+            outputs = self.model.evaluate(inputs)
+            for name in self.model.order:
+                self.step(name, outputs[name])
+            if key is not None:
+                self.cache.put_many(self.model.version, key, [[outputs[name]] for name in self.model.outputs])
+
+        row = {"series": self.index + 1, **inputs, **outputs, "duration": time.perf_counter() - started}
+
+        # Строка дописывается в конец results.csv, файл не перечитывается
+        if self.writer is not None:
+            self.writer.write_row(row)
+        else:
+            with ResultsWriter(self.results_path, self.model.columns) as writer:
+                writer.write_row(row)
 
-        # --- Новая формула (тепловая энергия) ---
-        Q = m * SPECIFIC_HEAT * (T - 20)
-        self.step("E_heat (тепловая)", Q)
+        duration = time.perf_counter() - started
+        metrics.observe(SERIES_SECONDS, duration)
+        self.log("series_finish", duration=duration)
 
-        row = {
-            "series": self.index + 1,
 
-            "m": m,
-            "g": g,
-            "h": h,
-            "V": V,
-            "T": T,
+class BatchTask:
+    """Пакетный расчёт: все серии считаются колонками NumPy за один проход."""
 
-            "SPECIFIC_HEAT": SPECIFIC_HEAT,
+    def __init__(self, params: pd.DataFrame, folder: str,
+                 writer: ResultsWriter = None, events: EventLog = None, model: Model = None,
+                 cache: ResultCache = None):
+        # Номер серии берётся из индекса DataFrame (index + 1), как у Task
+        self.params = params
+        self.folder = folder
+        self.writer = writer
+        self.events = events
+        self.model = model or DEFAULT_MODEL
+        self.cache = cache
+        self.cache_hits = 0  # серий последнего compute, не посчитанных по формулам (из кэша или повтор в пакете)
 
-            "E_pot": E_pot,
-            "E_kin": E_kin,
-            "E_total": E_total,
-            "Q": Q,
+        self.run_path = os.path.join("runs", folder)
+        os.makedirs(self.run_path, exist_ok=True)
 
-        }
+        self.events_path = events_path(folder)
+        self.results_path = os.path.join(self.run_path, "results.csv")
 
-        # Если файла нет — создаём
-        if not os.path.exists(self.results_path):
-            df = pd.DataFrame([row])
-            df.to_csv(self.results_path, index=False)
+    def columns(self):
+        """Числовые колонки параметров и текст ошибки для каждой строки (None — строка корректна)."""
+        index = self.params.index
+        values = {}
+        errors = np.full(len(index), None, dtype=object)
+
+        for key in self.model.inputs:
+            if key in self.params.columns:
+                raw = self.params[key]
+                values[key] = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=float)
+                missing = raw.isna().to_numpy()
+                invalid = ~missing & np.isnan(values[key])
+            else:
+                values[key] = np.full(len(index), np.nan)
+                missing = np.ones(len(index), dtype=bool)
+                invalid = np.zeros(len(index), dtype=bool)
+
+            # Как и в Task, сообщаем только о первом проблемном параметре
+            free = pd.isna(errors)
+            errors[missing & free] = f"Missing parameter: {key}"
+            errors[invalid & free] = f"Invalid parameter: {key}"
+
+        return values, errors
+
+    def compute(self):
+        """Считает все серии. Возвращает (DataFrame результатов, события журнала)."""
+        started = time.perf_counter()
+        values, errors = self.columns()
+        ok = pd.isna(errors)
+
+        inputs = {key: values[key][ok] for key in self.model.inputs}
+        if self.cache is None:
+            outputs = self.model.evaluate(inputs)
         else:
-            df = pd.read_csv(self.results_path)
-            df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
-            df.to_csv(self.results_path, index=False)
+            outputs, self.cache_hits = self.evaluate_cached(inputs)
+
+        results = pd.DataFrame({"series": self.params.index[ok] + 1, **inputs, **outputs},
+                               columns=self.model.columns)
+        # Серии пакета считаются вместе — каждой приписываем равную долю времени пакета
+        elapsed = time.perf_counter() - started
+        results["duration"] = elapsed / max(1, len(results))
+        metrics.observe(BATCH_SECONDS, elapsed)
+
+        # Отдельное событие — только у серии с ошибкой; рассчитанные серии пакета — одним итогом,
+        # их параметры и результаты и так лежат в results.csv
+        series = (self.params.index + 1).to_numpy()
+        events = [{"type": "series_error", "series": int(s), "error": error}
+                  for s, error in zip(series[~ok], errors[~ok])]
+        if len(results):
+            events.append({"type": "series_done", "first": int(series[ok].min()), "last": int(series[ok].max()),
+                           "calculated": len(results), "failed": len(events), "duration": elapsed})
+
+        return results, events
+
+    def evaluate_cached(self, inputs: dict):
+        """Как model.evaluate, но по формулам считаются только строки, которых нет в кэше.
+
+        Одинаковые строки пакета ищутся и считаются один раз. Возвращает
+        (выходные величины, число строк, не посчитанных по формулам).
+        """
+        version = self.model.version
+        hashes, first, inverse = np.unique(row_hashes(inputs, self.model.inputs),
+                                           return_index=True, return_inverse=True)
+        found = self.cache.get_many(version, hashes)
+        hit = np.array([h in found for h in hashes.tolist()], dtype=bool)
+
+        outputs = {name: np.empty(len(hashes)) for name in self.model.outputs}
+        if hit.any():
+            cached = np.array([found[h] for h in hashes[hit].tolist()], dtype=float).reshape(-1, len(self.model.outputs))
+            for i, name in enumerate(self.model.outputs):
+                outputs[name][hit] = cached[:, i]
+        if not hit.all():
+            miss = ~hit
+            computed = self.model.evaluate({key: value[first[miss]] for key, value in inputs.items()})
+            for name in self.model.outputs:
+                outputs[name][miss] = computed[name]
+            self.cache.put_many(version, hashes[miss], [computed[name] for name in self.model.outputs])
+        return {name: values[inverse] for name, values in outputs.items()}, int(len(inverse) - (~hit).sum())
+
+    def write(self, results: pd.DataFrame, events: list):
+        """Дописывает посчитанный пакет в events.jsonl и results.csv."""
+        self.events.emit_many(events)
+
+        if self.writer is not None:
+            self.writer.write_frame(results)
+        elif not results.empty:
+            with ResultsWriter(self.results_path, self.model.columns) as writer:
+                writer.write_frame(results)
 
-        self.log("Серия завершена.\n")
+    def solve(self):
+        if self.events is None:
+            with EventLog(self.events_path) as events:
+                self.events = events
+                try:
+                    return self.solve()
+                finally:
+                    self.events = None
+
+        results, events = self.compute()
+        events.append({"type": "run_summary", "calculated": len(results), "failed": len(self.params) - len(results)})
+        self.write(results, events)
+        return results
@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+from pydantic import TypeAdapter
+
+from .jobs import QueueFull
+from .schemas import TaskParams
+from .storage import get_storage
+
+BATCH_CHUNK = 100     # точек в блоке; история пишется одной записью на блок
+BATCH_LIMIT = 10000   # максимум точек в одном запросе
+BATCH_MAX_BYTES = 16 * 1024 * 1024   # максимум тела запроса
+BATCH_WINDOW = 8      # точек одного пакета одновременно в общей очереди расчётов
+BATCH_RETRY = 0.05    # пауза, когда в очереди нет места, секунд
+
+batch_adapter = TypeAdapter(list[TaskParams])
+
+
+class BatchTooLarge(Exception):
+    pass
+
+
+async def read_body(request) -> bytes:
+    """Тело запроса не больше BATCH_MAX_BYTES; большее отклоняется, не дочитываясь до конца."""
+    length = request.headers.get("content-length", "")
+    if length.isdigit() and int(length) > BATCH_MAX_BYTES:
+        raise BatchTooLarge(f"Тело запроса больше {BATCH_MAX_BYTES} байт")
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > BATCH_MAX_BYTES:
+            raise BatchTooLarge(f"Тело запроса больше {BATCH_MAX_BYTES} байт")
+    return bytes(body)
+
+
+def parse_batch(body: bytes, content_type: str):
+    """JSON-массив или NDJSON (по строке на точку) -> список TaskParams.
+
+    Число точек проверяется до проверки самих точек.
+    """
+    if "ndjson" in content_type or "jsonl" in content_type:
+        lines = [line for line in body.decode("utf-8").splitlines() if line.strip()]
+        if len(lines) > BATCH_LIMIT:
+            raise BatchTooLarge(f"Не больше {BATCH_LIMIT} точек за запрос")
+        body = ("[" + ",".join(lines) + "]").encode("utf-8")
+    data = json.loads(body)
+    if isinstance(data, list) and len(data) > BATCH_LIMIT:
+        raise BatchTooLarge(f"Не больше {BATCH_LIMIT} точек за запрос")
+    return batch_adapter.validate_python(data)
+
+
+def history_row(job) -> dict:
+    return {"A1": job.params.a1, "B1": job.params.b1, **job.result}
+
+
+def save_finished(storage, job):
+    if job.status == "done":
+        storage.append([history_row(job)])
+
+
+async def stream_batch(jobs, items, use_cache=True):
+    """Считает точки через общую очередь расчётов и отдаёт NDJSON-строки по мере готовности.
+
+    В очереди одновременно не больше BATCH_WINDOW точек пакета: одиночные
+    расчёты и другие пакеты не ждут, пока пройдёт весь пакет.
+    """
+    storage = get_storage()
+    failed = 0
+    pending = {}
+    rows = []
+    try:
+        for start in range(0, len(items), BATCH_CHUNK):
+            chunk = items[start:start + BATCH_CHUNK]
+            rows = []
+            queued = 0
+            while queued < len(chunk) or pending:
+                while queued < len(chunk) and len(pending) < BATCH_WINDOW:
+                    try:
+                        job = jobs.submit(chunk[queued], use_cache, save=False)
+                    except QueueFull:
+                        break
+                    pending[asyncio.wrap_future(job.future)] = (start + queued, job)
+                    queued += 1
+                if not pending:
+                    await asyncio.sleep(BATCH_RETRY)
+                    continue
+                # Пока не все точки блока в очереди, просыпаемся и по таймеру — досылать их
+                timeout = BATCH_RETRY if queued < len(chunk) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    index, job = pending.pop(future)
+                    params = items[index]
+                    if job.status == "done":
+                        rows.append(history_row(job))
+                        line = {"index": index, "params": params.model_dump(), "result": job.result}
+                    else:
+                        failed += 1
+                        line = {"index": index, "params": params.model_dump(), "error": job.error or job.status}
+                    yield json.dumps(line, ensure_ascii=False) + "\n"
+
+            # Одна запись в историю на блок
+            if rows:
+                storage.append(rows)
+                rows = []
+    finally:
+        # Клиент отключился. Посчитанное в этом блоке сохраняем в историю; точки, которые
+        # ещё ждут в очереди, не считаем, а уже начатые допишутся в историю по готовности
+        for _, job in pending.values():
+            if job.future.done() or not job.future.cancel():
+                job.future.add_done_callback(lambda future, job=job: save_finished(storage, job))
+        if rows:
+            storage.append(rows)
+
+    yield json.dumps({"done": len(items) - failed, "failed": failed}) + "\n"
@@ -1,10 +1,30 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
+from . import metrics
 from .schemas import TaskParams
-from .task import Task
-import csv, os
+from .jobs import JobQueue, QueueFull
+from .history import etag
+from .storage import get_storage
+from .solve_cache import get_cache
+from .batch import BatchTooLarge, parse_batch, read_body, stream_batch
+import asyncio, json, time
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # При остановке дописываем всё, что осталось в очереди записи
+    get_storage().close()
+
+
+app = FastAPI(lifespan=lifespan)
+jobs = JobQueue()
+
+JOB_WAIT_LIMIT = 30  # максимальное ожидание в long-poll, секунд
 
 origins = [
     "http://localhost:5173",
@@ -17,31 +37,131 @@ app.add_middleware(
     # allow_credentials=True,    # разрешаем передачу cookies / auth-заголовков
     allow_methods=["*"],       # разрешаем все HTTP методы (GET, POST, PUT, DELETE и т.п.)
     allow_headers=["*"],       # разрешаем любые кастомные заголовки в запросах
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count"],  # заголовки пагинации, видимые фронту
 )
 
+REQUEST_SECONDS = metrics.histogram("nir_api_request_seconds", "Обработка HTTP-запроса")
+
+if metrics.ENABLED:
+    @app.middleware("http")
+    async def time_requests(request: Request, call_next):
+        # Для потоковых ответов (/run/batch) — время до начала ответа
+        started = time.perf_counter()
+        response = await call_next(request)
+        route = request.scope.get("route")
+        metrics.observe(REQUEST_SECONDS, time.perf_counter() - started,
+                        method=request.method, route=getattr(route, "path", "unmatched"),
+                        status=response.status_code)
+        return response
+
+metrics.gauge("nir_api_job_queue_depth", "Расчётов в очереди и в работе", lambda: jobs.depth())
+metrics.gauge("nir_api_solve_cache_hit_ratio", "Доля попаданий в кэш результатов", lambda: get_cache().stats()["hit_ratio"])
+
+
+def submit_job(data: TaskParams, cache: bool = True):
+    try:
+        return jobs.submit(data, cache)
+    except QueueFull:
+        raise HTTPException(status_code=429, detail="Очередь расчётов заполнена",
+                            headers={"Retry-After": "1"})
+
+
+async def wait_job(job, timeout=None, cancel=False):
+    # Ждём завершения в event loop, не занимая поток пула.
+    # cancel=True — задача нужна только этому запросу: если клиент ушёл, снимаем её из очереди
+    try:
+        await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+    except asyncio.TimeoutError:
+        pass
+    except asyncio.CancelledError:
+        if job.future.cancelled():
+            return  # отменили саму задачу (DELETE /jobs/{id}), а не ожидание
+        if cancel:
+            job.future.cancel()
+        raise
+
 
 @app.post("/run")
-def run_task(data: TaskParams):
-    task = Task(data)
-    result = task.solve()
-    return {"result": result}
+async def run_task(data: TaskParams, cache: bool = True):
+    # Синхронный вариант для фронта: тот же пул, но ответ — после расчёта.
+    # cache=false — посчитать заново, не заглядывая в кэш результатов
+    job = submit_job(data, cache)
+    await wait_job(job, cancel=True)
+    if job.status != "done":
+        raise HTTPException(status_code=500, detail=job.error or job.status)
+    return {"result": job.result}
+
+
+@app.post("/run/batch")
+async def run_batch(request: Request, cache: bool = True):
+    # Тело — JSON-массив TaskParams или NDJSON-файл (Content-Type: application/x-ndjson).
+    # Ответ — NDJSON: строка на каждую точку по мере готовности, в конце итог.
+    # Точки идут через общую очередь расчётов; если она заполнена — 429, как у /run и /jobs
+    try:
+        items = parse_batch(await read_body(request), request.headers.get("content-type", ""))
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=json.loads(e.json(include_url=False)))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Некорректный JSON: {e}")
+    if jobs.full():
+        raise HTTPException(status_code=429, detail="Очередь расчётов заполнена", headers={"Retry-After": "1"})
+    return StreamingResponse(stream_batch(jobs, items, cache), media_type="application/x-ndjson")
+
+
+@app.post("/jobs", status_code=202)
+def create_job(data: TaskParams, cache: bool = True):
+    job = submit_job(data, cache)
+    return {"id": job.id, "status": job.status, "queue_depth": jobs.depth()}
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    # wait > 0 — long-poll: отвечаем, как только задача завершится, но не позже wait секунд
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    if wait > 0:
+        await wait_job(job, min(wait, JOB_WAIT_LIMIT))
+    return job.info()
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача не найдена")
+    if not jobs.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Задачу нельзя отменить: {job.status}")
+    return job.info()
 
 
 @app.get("/history")
-def get_history():
-    CSV_FILE = "history.csv"
-    if not os.path.exists(CSV_FILE):
-        return []
-
-    rows = []
-    with open(CSV_FILE, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rows.append({
-                "A1": float(row["A1"]),
-                "B1": float(row["B1"]),
-                "RES1": float(row["RES1"]),
-                "RES2": float(row["RES2"]),
-                "RES3": float(row["RES3"]),
-            })
+def get_history(request: Request, response: Response, cursor: int = 0, limit: Optional[int] = None):
+    # cursor — X-Next-Cursor из предыдущего ответа (в SQLite — id последней строки, в CSV — число строк);
+    # в ответе только строки после него. ETag позволяет получить 304 без тела.
+    storage = get_storage()
+    # Один раз дожидаемся записи строк этого процесса: /history видит только что посчитанное
+    storage.flush()
+    tag = etag(storage.version(), cursor, limit)
+    if request.headers.get("if-none-match") == tag:
+        return Response(status_code=304, headers={"ETag": tag})
+
+    rows, next_cursor, total = storage.read(max(0, cursor), None if limit is None else max(0, limit))
+    response.headers["ETag"] = tag
+    response.headers["X-Next-Cursor"] = str(next_cursor)
+    response.headers["X-Total-Count"] = str(total)
     return rows
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    # Попадания в кэш результатов по уровням, промахи, обходы и доля попаданий
+    return get_cache().stats()
+
+
+@app.get("/metrics")
+def get_metrics():
+    # Формат Prometheus: длительности запросов, расчётов и операций с историей
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
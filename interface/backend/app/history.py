@@ -0,0 +1,65 @@
+import csv
+import io
+import os
+import threading
+
+HISTORY_COLUMNS = ["A1", "B1", "RES1", "RES2", "RES3"]
+
+
+class HistoryCache:
+    """Разобранный history.csv в памяти.
+
+    Файл перечитывается только при изменении размера или mtime; если файл лишь вырос
+    (дозапись), разбираются только новые строки с сохранённого смещения.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = []
+        self.offset = 0
+        self.signature = None
+        self.lock = threading.Lock()
+
+    def stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def load(self):
+        """Возвращает (строки, сигнатура файла); сигнатура None — файла нет."""
+        with self.lock:
+            signature = self.stat()
+            if signature == self.signature:
+                return self.rows, signature
+            if signature is None:
+                self.rows, self.offset, self.signature = [], 0, None
+                return self.rows, None
+
+            # Тот же файл стал длиннее — дочитываем хвост, иначе разбираем заново
+            grown = self.signature is not None and signature[0] == self.signature[0] and signature[1] >= self.offset
+            if not grown:
+                self.rows, self.offset = [], 0
+
+            with open(self.path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1  # недописанную последнюю строку оставляем на потом
+            text = data[:end].decode("utf-8")
+            lines = text.splitlines()
+            if self.offset == 0 and lines:
+                lines = lines[1:]  # заголовок
+
+            for row in csv.reader(io.StringIO("\n".join(lines))):
+                if len(row) == len(HISTORY_COLUMNS):
+                    self.rows.append(dict(zip(HISTORY_COLUMNS, map(float, row))))
+            self.offset += end
+            self.signature = signature
+            return self.rows, signature
+
+
+def etag(version, cursor, limit):
+    if version is None:
+        return 'W/"empty"'
+    return f'W/"{version}-{cursor}-{limit}"'
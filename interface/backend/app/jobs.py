@@ -0,0 +1,106 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .task import Task
+
+JOB_WORKERS = 4         # одновременно выполняемых расчётов
+JOB_QUEUE_LIMIT = 100   # расчётов в очереди и в работе; сверх лимита — 429
+JOB_KEEP_FINISHED = 1000
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, params, use_cache=True, save=True):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.use_cache = use_cache
+        self.save = save            # False — история пишется вызывающим (пакет — одной записью на блок)
+        self.status = "queued"      # queued | running | done | failed | cancelled
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+
+    def info(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "params": self.params.model_dump(),
+            "result": self.result,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+        }
+
+
+class JobQueue:
+    """Очередь расчётов с ограниченным пулом потоков и лимитом на число ожидающих задач."""
+
+    def __init__(self, workers=JOB_WORKERS, limit=JOB_QUEUE_LIMIT, keep_finished=JOB_KEEP_FINISHED):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self.limit = limit
+        self.keep_finished = keep_finished
+        self.jobs = OrderedDict()
+        self.active = 0
+        self.lock = threading.Lock()
+
+    def submit(self, params, use_cache=True, save=True) -> Job:
+        job = Job(params, use_cache, save)
+        with self.lock:
+            if self.active >= self.limit:
+                raise QueueFull()
+            self.active += 1
+            self.jobs[job.id] = job
+            self.trim()
+        job.future = self.executor.submit(self.run, job)
+        job.future.add_done_callback(lambda f: self.release(job))
+        return job
+
+    def run(self, job: Job):
+        job.status = "running"
+        job.started = time.time()
+        try:
+            job.result = Task(job.params).solve(job.use_cache, job.save)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished = time.time()
+        return job.result
+
+    def release(self, job: Job):
+        with self.lock:
+            self.active -= 1
+        if job.future.cancelled():
+            job.status = "cancelled"
+            job.finished = time.time()
+
+    def trim(self):
+        # Старые завершённые задачи удаляем, чтобы словарь не рос бесконечно
+        finished = [j for j in self.jobs.values() if j.status in ("done", "failed", "cancelled")]
+        for job in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self.jobs[job.id]
+
+    def get(self, job_id: str):
+        return self.jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """Отменить можно только задачу, которая ещё ждёт в очереди."""
+        job = self.jobs.get(job_id)
+        return job is not None and job.future.cancel()
+
+    def depth(self) -> int:
+        return self.active
+
+    def full(self) -> bool:
+        return self.active >= self.limit
@@ -0,0 +1,148 @@
+# Замеры времени API и выдача их в текстовом формате Prometheus (/metrics)
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# METRICS=0 выключает замеры: timer() отдаёт пустой контекст, timed() не оборачивает функцию
+ENABLED = os.environ.get("METRICS", "1").lower() not in ("0", "false", "no")
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_histograms = {}
+_gauges = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    """Гистограмма длительностей (секунды) с разбиением по меткам."""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.series = {}  # метки -> [счётчики по корзинам, сумма, количество]
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, labels: tuple = ()):
+        i = bisect_left(BUCKETS, value)
+        with self.lock:
+            entry = self.series.get(labels)
+            if entry is None:
+                entry = self.series[labels] = [[0] * len(BUCKETS), 0.0, 0]
+            if i < len(BUCKETS):
+                entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            series = [(labels, list(counts), total, count) for labels, (counts, total, count) in self.series.items()]
+        for labels, counts, total, count in sorted(series):
+            cumulative = 0
+            for bound, n in zip(BUCKETS, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{format_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{self.name}_bucket{format_labels(labels, le='+Inf')} {count}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {total}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {count}")
+        return lines
+
+
+def format_labels(labels: tuple, **extra) -> str:
+    pairs = list(labels) + [(k, v) for k, v in extra.items()]
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def histogram(name: str, help: str = "") -> Histogram:
+    """Гистограмма по имени; брать один раз при импорте модуля, а не на каждый замер."""
+    with _lock:
+        if name not in _histograms:
+            _histograms[name] = Histogram(name, help)
+        return _histograms[name]
+
+
+def gauge(name: str, help: str, fn):
+    """Значение, которое считается в момент выдачи /metrics (fn() -> число)."""
+    with _lock:
+        _gauges[name] = (help, fn)
+
+
+class Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: tuple):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, self.labels)
+
+
+class NoTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+NO_TIMER = NoTimer()
+
+
+def timer(hist: Histogram, **labels):
+    """with timer(STORAGE_SECONDS, op="write"): ... — замер блока кода."""
+    if not ENABLED:
+        return NO_TIMER
+    return Timer(hist, tuple(sorted(labels.items())))
+
+
+def observe(hist: Histogram, value: float, **labels):
+    """Записать уже измеренную длительность."""
+    if ENABLED:
+        hist.observe(value, tuple(sorted(labels.items())) if labels else ())
+
+
+def timed(name: str, help: str = "", **labels):
+    """Декоратор: замер каждого вызова функции."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+        hist = histogram(name, help)
+        key = tuple(sorted(labels.items()))
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.observe(time.perf_counter() - started, key)
+        return wrapper
+    return decorate
+
+
+def render() -> str:
+    with _lock:
+        histograms = list(_histograms.values())
+        gauges = list(_gauges.items())
+    lines = []
+    for hist in sorted(histograms, key=lambda h: h.name):
+        lines.extend(hist.render())
+    for name, (help, fn) in sorted(gauges):
+        try:
+            value = float(fn())
+        except Exception:
+            continue
+        lines.extend([f"# HELP {name} {help}", f"# TYPE {name} gauge", f"{name} {value}"])
+    return "\n".join(lines) + "\n"
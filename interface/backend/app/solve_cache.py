@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+CACHE_SIZE = int(os.environ.get("SOLVE_CACHE_SIZE", "1024"))            # записей в памяти
+CACHE_TTL = float(os.environ.get("SOLVE_CACHE_TTL", "86400"))           # секунд; 0 — без срока
+CACHE_DB = os.environ.get("SOLVE_CACHE_DB", "solve_cache.db")           # пусто — без дискового уровня
+CACHE_DB_SIZE = int(os.environ.get("SOLVE_CACHE_DB_SIZE", "100000"))    # записей на диске
+
+
+def cache_key(params, version):
+    """Ключ по каноническому виду параметров: отсортированные поля, числа как float."""
+    data = {k: float(v) + 0.0 if isinstance(v, (int, float)) else v for k, v in params.model_dump().items()}
+    text = json.dumps({"v": version, "params": data}, sort_keys=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SolveCache:
+    """Кэш результатов Task.solve: LRU в памяти и (необязательно) SQLite на диске, переживающий перезапуск."""
+
+    def __init__(self, size=CACHE_SIZE, ttl=CACHE_TTL, db_path=CACHE_DB, db_size=CACHE_DB_SIZE):
+        self.size = size
+        self.ttl = ttl
+        self.db_path = db_path
+        self.db_size = db_size
+        self.memory = OrderedDict()   # key -> (время записи, результат)
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0, "evictions": 0}
+        self.puts = 0
+
+        if self.db_path:
+            self.connect().execute(
+                "CREATE TABLE IF NOT EXISTS solve_cache ("
+                "key TEXT PRIMARY KEY, result TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+
+    def connect(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self.local.conn = conn
+        return conn
+
+    def expired(self, created):
+        return self.ttl > 0 and time.time() - created > self.ttl
+
+    def get(self, key):
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None and not self.expired(entry[0]):
+                self.memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return entry[1]
+            if entry is not None:
+                del self.memory[key]
+
+        if self.db_path:
+            conn = self.connect()
+            row = conn.execute("SELECT result, created FROM solve_cache WHERE key = ?", (key,)).fetchone()
+            if row is not None and not self.expired(row[1]):
+                conn.execute("UPDATE solve_cache SET accessed = ? WHERE key = ?", (time.time(), key))
+                result = json.loads(row[0])
+                with self.lock:
+                    self.counters["disk_hits"] += 1
+                    self.remember(key, row[1], result)
+                return result
+            if row is not None:
+                conn.execute("DELETE FROM solve_cache WHERE key = ?", (key,))
+
+        with self.lock:
+            self.counters["misses"] += 1
+        return None
+
+    def put(self, key, result):
+        now = time.time()
+        with self.lock:
+            self.remember(key, now, result)
+            self.puts += 1
+            trim = self.puts % 100 == 0
+
+        if self.db_path:
+            conn = self.connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO solve_cache (key, result, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result), now, now),
+            )
+            if trim:
+                self.trim_disk(conn)
+
+    def remember(self, key, created, result):
+        self.memory[key] = (created, result)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.size:
+            self.memory.popitem(last=False)
+            self.counters["evictions"] += 1
+
+    def trim_disk(self, conn):
+        # Просроченные записи и всё сверх db_size (по давности обращения)
+        if self.ttl > 0:
+            conn.execute("DELETE FROM solve_cache WHERE created < ?", (time.time() - self.ttl,))
+        conn.execute(
+            "DELETE FROM solve_cache WHERE key IN ("
+            "SELECT key FROM solve_cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+            (self.db_size,),
+        )
+
+    def bypass(self):
+        with self.lock:
+            self.counters["bypassed"] += 1
+
+    def stats(self):
+        with self.lock:
+            stats = dict(self.counters)
+            stats["memory_size"] = len(self.memory)
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_ratio"] = hits / lookups if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> SolveCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SolveCache()
+        return _cache
@@ -0,0 +1,211 @@
+import abc
+import csv
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from . import metrics
+from .history import HISTORY_COLUMNS, HistoryCache
+
+try:
+    import fcntl
+except ImportError:  # Windows: межпроцессной блокировки CSV нет
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CSV_FILE = "history.csv"
+DB_FILE = "history.db"
+STORAGE_BACKEND = os.environ.get("HISTORY_STORAGE", "sqlite")   # sqlite | csv
+
+WRITE_BATCH = 500      # строк в одной транзакции
+WRITE_DELAY = 0.05     # сколько ждать добора пачки, секунд
+
+STORAGE_SECONDS = metrics.histogram("nir_api_storage_seconds", "Запись и чтение истории")
+
+
+class Storage(abc.ABC):
+    """Хранилище истории расчётов: строки с колонками HISTORY_COLUMNS."""
+
+    @abc.abstractmethod
+    def append(self, rows):
+        ...
+
+    @abc.abstractmethod
+    def read(self, cursor=0, limit=None):
+        """Записанные строки после cursor. Возвращает (строки, следующий cursor, всего строк)."""
+
+    @abc.abstractmethod
+    def version(self):
+        """Метка записанного состояния для ETag; None — истории нет."""
+
+    def flush(self):
+        """Дождаться записи строк, переданных в append до вызова."""
+
+    def close(self):
+        pass
+
+
+class CsvStorage(Storage):
+    """history.csv; дозапись под блокировкой, чтение через кэш с инкрементальным разбором."""
+
+    def __init__(self, path=CSV_FILE):
+        self.path = path
+        self.cache = HistoryCache(path)
+        self.lock = threading.Lock()
+
+    @metrics.timed("nir_api_storage_seconds", "Запись и чтение истории", backend="csv", op="write")
+    def append(self, rows):
+        with self.lock, open(self.path, "a", newline="", encoding="utf-8") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                writer = csv.writer(f)
+                if f.tell() == 0:
+                    writer.writerow(HISTORY_COLUMNS)
+                writer.writerows([[row[c] for c in HISTORY_COLUMNS] for row in rows])
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @metrics.timed("nir_api_storage_seconds", "Запись и чтение истории", backend="csv", op="read")
+    def read(self, cursor=0, limit=None):
+        rows, _ = self.cache.load()
+        end = len(rows) if limit is None else min(len(rows), cursor + limit)
+        return rows[cursor:end], max(cursor, end), len(rows)
+
+    def version(self):
+        _, signature = self.cache.load()
+        return None if signature is None else f"{signature[1]}-{signature[2]}"
+
+
+class SqliteStorage(Storage):
+    """SQLite в режиме WAL. Запись идёт через очередь: фоновый поток пишет пачками в одной транзакции."""
+
+    def __init__(self, path=DB_FILE, import_csv=CSV_FILE):
+        self.path = path
+        self.local = threading.local()
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.written_cond = threading.Condition(self.lock)
+        self.queued = 0     # строк поставлено в очередь записи за всё время
+        self.written = 0    # из них уже записано (или отброшено из-за ошибки)
+
+        conn = self.connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                A1 REAL, B1 REAL, RES1 REAL, RES2 REAL, RES3 REAL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS history_params ON history (A1, B1);
+            CREATE INDEX IF NOT EXISTS history_created ON history (created_at);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+        if import_csv:
+            self.migrate(import_csv)
+
+        self.writer = threading.Thread(target=self.write_behind, daemon=True)
+        self.writer.start()
+
+    def connect(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def migrate(self, csv_path):
+        """Однократный импорт существующего history.csv."""
+        conn = self.connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            done = conn.execute("SELECT value FROM meta WHERE key = 'csv_imported'").fetchone()
+            if done or not os.path.exists(csv_path):
+                return
+            rows, _ = HistoryCache(csv_path).load()
+            created = os.path.getmtime(csv_path)
+            conn.executemany(
+                "INSERT INTO history (A1, B1, RES1, RES2, RES3, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [[row[c] for c in HISTORY_COLUMNS] + [created] for row in rows],
+            )
+            conn.execute("INSERT INTO meta (key, value) VALUES ('csv_imported', ?)", (str(len(rows)),))
+
+    def append(self, rows):
+        now = time.time()
+        with self.lock:
+            for row in rows:
+                self.queue.put([row[c] for c in HISTORY_COLUMNS] + [now])
+            self.queued += len(rows)
+
+    def write_behind(self):
+        conn = self.connect()
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + WRITE_DELAY
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(self.queue.get(timeout=max(0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                with metrics.timer(STORAGE_SECONDS, backend="sqlite", op="write"), conn:
+                    conn.executemany(
+                        "INSERT INTO history (A1, B1, RES1, RES2, RES3, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                        batch,
+                    )
+            except sqlite3.Error:
+                logger.exception("Не удалось записать %d строк истории", len(batch))
+            finally:
+                with self.lock:
+                    self.written += len(batch)
+                    self.written_cond.notify_all()
+
+    def flush(self):
+        """Ждёт записи строк, поставленных в очередь до вызова; пришедшие позже не ждём.
+
+        read() и version() сами не ждут: запрос к истории вызывает flush один раз.
+
+        При непрерывном потоке записей очередь может не опустеть никогда, а эта отметка достижима.
+        """
+        with self.lock:
+            target = self.queued
+            self.written_cond.wait_for(lambda: self.written >= target)
+
+    @metrics.timed("nir_api_storage_seconds", "Запись и чтение истории", backend="sqlite", op="read")
+    def read(self, cursor=0, limit=None):
+        conn = self.connect()
+        sql = "SELECT id, A1, B1, RES1, RES2, RES3 FROM history WHERE id > ? ORDER BY id"
+        args = [cursor]
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        rows = conn.execute(sql, args).fetchall()
+        total = conn.execute("SELECT count(*) FROM history").fetchone()[0]
+        next_cursor = rows[-1][0] if rows else cursor
+        return [dict(zip(HISTORY_COLUMNS, row[1:])) for row in rows], next_cursor, total
+
+    def version(self):
+        last = self.connect().execute("SELECT max(id) FROM history").fetchone()[0]
+        return None if last is None else str(last)
+
+    def close(self):
+        self.flush()
+
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> Storage:
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            _storage = SqliteStorage() if STORAGE_BACKEND == "sqlite" else CsvStorage()
+        return _storage
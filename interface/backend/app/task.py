@@ -1,38 +1,49 @@
 import time
 import random
-import csv
-import os
 
-CSV_FILE = "history.csv"
+from . import metrics
+from .storage import get_storage
+from .solve_cache import cache_key, get_cache
 
 class Task:
+    # Версия модели входит в ключ кэша: при изменении формул старые результаты не используются
+    version = "1"
+    # True — результат зависит только от параметров и его можно брать из кэша.
+    # Заглушка решателя случайна, поэтому кэш обходится; настоящий решатель включает его здесь
+    deterministic = False
+
     def __init__(self, params):
+        self.params = params
         self.a1 = params.a1
         self.b1 = params.b1
 
+    def solve(self, use_cache=True, save=True):
+        cache = get_cache()
+        if use_cache and self.deterministic:
+            key = cache_key(self.params, self.version)
+            result = cache.get(key)
+            if result is None:
+                result = self.calculate()
+                cache.put(key, result)
+        else:
+            cache.bypass()
+            result = self.calculate()
+
+        # Попадание в кэш — тоже запуск пользователя, в истории он появляется отдельной строкой
+        if save:
+            self.save(result)
+        return result
+
     # поменять надо 
-    def solve(self):
+    @metrics.timed("nir_api_task_calculate_seconds", "Расчёт одной точки (Task.calculate)")
+    def calculate(self):
         time.sleep(1)
 
-        result = {
+        return {
             "RES1": random.randint(1, 10),
             "RES2": random.randint(1, 10),
             "RES3": random.randint(1, 10),
         }
 
-        self.save_to_csv(result)
-        return result  
-
-    def save_to_csv(self, result):
-        file_exists = os.path.isfile(CSV_FILE)
-
-        with open(CSV_FILE, "a", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-
-            if not file_exists:
-                writer.writerow(["A1", "B1", "RES1", "RES2", "RES3"])
-
-            writer.writerow([self.a1, self.b1,
-                             result["RES1"],
-                             result["RES2"],
-                             result["RES3"]])
+    def save(self, result):
+        get_storage().append([{"A1": self.a1, "B1": self.b1, **result}])
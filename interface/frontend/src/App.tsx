@@ -1,4 +1,4 @@
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { runTask, getHistory } from "./api/api";
 import type { TaskParams, HistoryEntry } from "./types/Task";
 import "./App.css";
@@ -7,6 +7,7 @@ export default function App() {
   const [params, setParams] = useState<TaskParams>({ a1: 0, b1: 0 });
   const [history, setHistory] = useState<HistoryEntry[]>([]);
   const [fileName, setFileName] = useState<string>("");
+  const historyCursor = useRef(0);
 
   useEffect(() => {
     loadHistory();
@@ -44,10 +45,16 @@ export default function App() {
 
   async function loadHistory() {
     try {
-      const data = await getHistory();
-      setHistory(data);
-    } catch {
-      console.log("Ошибка загрузки истории");
+      // Догружаем только строки, появившиеся после последнего запроса
+      const from = historyCursor.current;
+      const page = await getHistory(from);
+      if (historyCursor.current !== from) return;  // параллельный запрос уже догрузил эти строки
+      historyCursor.current = page.nextCursor;
+      if (page.rows.length > 0) {
+        setHistory((prev) => [...prev, ...page.rows]);
+      }
+    } catch (e) {
+      console.error("Ошибка загрузки истории", e);
     }
   }
 
@@ -1,4 +1,4 @@
-import type { TaskParams, RunResponse, HistoryEntry } from "../types/Task";
+import type { TaskParams, RunResponse, HistoryEntry, HistoryPage } from "../types/Task";
 
 export async function runTask(params: TaskParams): Promise<RunResponse> {
   const res = await fetch("http://127.0.0.1:8000/run", {
@@ -13,13 +13,20 @@ export async function runTask(params: TaskParams): Promise<RunResponse> {
   return res.json();
 }
 
-export async function getHistory(): Promise<HistoryEntry[]> {
-  const res = await fetch("http://127.0.0.1:8000/history");
+// cursor — X-Next-Cursor из предыдущего ответа (0 — с начала); сервер вернёт только строки после него.
+// Это непрозрачная метка сервера (в SQLite — id последней строки), считать её на клиенте нельзя
+export async function getHistory(cursor = 0): Promise<HistoryPage> {
+  const res = await fetch(`http://127.0.0.1:8000/history?cursor=${cursor}`);
 
   if (!res.ok) {
     throw new Error("Ошибка запроса");
   }
 
-  return res.json();
+  const header = res.headers.get("X-Next-Cursor");
+  if (header === null) {
+    throw new Error("Сервер не вернул X-Next-Cursor");
+  }
+  const rows: HistoryEntry[] = await res.json();
+  return { rows, nextCursor: Number(header) };
 }
 
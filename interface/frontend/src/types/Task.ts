@@ -18,3 +18,8 @@ export interface HistoryEntry {
   RES2: number;
   RES3: number;
 }
+
+export interface HistoryPage {
+  rows: HistoryEntry[];
+  nextCursor: number;
+}
@@ -0,0 +1,58 @@
+"""Тесты dash и interface/backend.
+
+Запуск из корня репозитория:
+
+    pytest tests
+
+Каждый тест работает во временном каталоге: модули пишут по относительным путям
+(runs/, history.db, solve_cache.db), данные репозитория не трогаются.
+"""
+import importlib
+import importlib.util
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASH_DIR = os.path.join(ROOT, "dash")
+BACKEND_DIR = os.path.join(ROOT, "interface", "backend")
+
+# dash импортирует соседние модули по имени (from task import ...), backend — пакет app
+sys.path.insert(0, DASH_DIR)
+sys.path.insert(0, BACKEND_DIR)
+
+
+def load_module(name: str, path: str):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def backend(workdir, monkeypatch):
+    """Пакет app из interface/backend со своей историей и кэшем результатов на каждый тест."""
+    # app в interface/backend — пакет без __init__.py, и обычный модуль dash/app.py его перекрывает;
+    # на время импорта убираем dash из sys.path
+    sys.path.remove(DASH_DIR)
+    try:
+        fast_api = importlib.import_module("app.fast_api")
+    finally:
+        sys.path.insert(1, DASH_DIR)
+    from app import solve_cache, storage
+    monkeypatch.setattr(storage, "_storage", storage.SqliteStorage(path="history.db", import_csv=None))
+    monkeypatch.setattr(solve_cache, "_cache", solve_cache.SolveCache(db_path=""))
+    return fast_api
+
+
+@pytest.fixture
+def dash_app(workdir):
+    return load_module("dash_app", os.path.join(DASH_DIR, "app.py"))
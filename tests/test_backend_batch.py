@@ -0,0 +1,50 @@
+import asyncio
+import json
+import threading
+
+
+def test_disconnect_mid_stream_keeps_finished_points(backend, monkeypatch):
+    from app import batch, task
+    from app.jobs import JobQueue
+    from app.schemas import TaskParams
+    from app.storage import get_storage
+
+    # Первые точки считаются сразу, остальные — пока тест не отпустит: к отключению клиента
+    # часть точек готова, часть считается, часть ждёт в очереди
+    release = threading.Event()
+    running = []
+
+    def calculate(self):
+        if self.a1 >= 3:
+            running.append(self.a1)
+            release.wait(5)
+        return {"RES1": self.a1, "RES2": 0, "RES3": 0}
+
+    monkeypatch.setattr(task.Task, "calculate", calculate)
+    jobs = JobQueue(workers=2)
+    items = [TaskParams(a1=i, b1=0) for i in range(20)]
+
+    async def disconnect_after(count):
+        stream = batch.stream_batch(jobs, items)
+        lines = [json.loads(await stream.__anext__()) for _ in range(count)]
+        while len(running) < 2:   # оба воркера заняты медленными точками
+            await asyncio.sleep(0.01)
+        await stream.aclose()
+        return lines
+
+    lines = asyncio.run(disconnect_after(3))
+    release.set()
+    jobs.executor.shutdown(wait=True)
+
+    storage = get_storage()
+    storage.flush()
+    saved = sorted(row["A1"] for row in storage.read()[0])
+    done = sorted(job.params.a1 for job in jobs.jobs.values() if job.status == "done")
+    statuses = {job.status for job in jobs.jobs.values()}
+
+    assert len(lines) == 3 and all("result" in line for line in lines)
+    assert {line["params"]["a1"] for line in lines} <= set(saved)
+    # В истории всё, что успело посчитаться, включая точки, ещё считавшиеся при отключении
+    assert saved == done
+    assert saved == [0.0, 1.0, 2.0, 3.0, 4.0]
+    assert statuses == {"done", "cancelled"}
@@ -0,0 +1,33 @@
+import pytest
+
+
+@pytest.fixture
+def api(backend):
+    from fastapi.testclient import TestClient
+    with TestClient(backend.app) as client:
+        yield client
+
+
+def test_history_waits_for_write_behind_once(api, monkeypatch):
+    from app.storage import get_storage
+    storage = get_storage()
+    flushes = []
+    flush = storage.flush
+    monkeypatch.setattr(storage, "flush", lambda: flushes.append(1) or flush())
+
+    storage.append([{"A1": 1.0, "B1": 2.0, "RES1": 3, "RES2": 4, "RES3": 5}])
+    response = api.get("/history")
+
+    assert len(flushes) == 1
+    assert [row["A1"] for row in response.json()] == [1.0]
+    assert response.headers["x-next-cursor"] == "1"
+
+
+def test_unchanged_history_is_not_modified(api):
+    from app.storage import get_storage
+    get_storage().append([{"A1": 1.0, "B1": 2.0, "RES1": 3, "RES2": 4, "RES3": 5}])
+    tag = api.get("/history").headers["etag"]
+
+    assert api.get("/history", headers={"If-None-Match": tag}).status_code == 304
+    get_storage().append([{"A1": 2.0, "B1": 2.0, "RES1": 3, "RES2": 4, "RES3": 5}])
+    assert api.get("/history", headers={"If-None-Match": tag}).status_code == 200
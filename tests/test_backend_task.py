@@ -0,0 +1,63 @@
+import pytest
+
+
+@pytest.fixture
+def task(backend, monkeypatch):
+    from app import task
+    calls = []
+
+    def calculate(self):
+        calls.append(self.params)
+        return {"RES1": len(calls), "RES2": 0, "RES3": 0}
+
+    monkeypatch.setattr(task.Task, "calculate", calculate)
+    task.calls = calls
+    return task
+
+
+def params(a1=1.0, b1=2.0):
+    from app.schemas import TaskParams
+    return TaskParams(a1=a1, b1=b1)
+
+
+def history():
+    from app.storage import get_storage
+    storage = get_storage()
+    storage.flush()
+    return storage.read()[0]
+
+
+def test_random_solver_bypasses_cache(task):
+    # Заглушка решателя случайна: каждый запуск считается заново
+    assert task.Task.deterministic is False
+    first = task.Task(params()).solve()
+    second = task.Task(params()).solve()
+
+    assert len(task.calls) == 2
+    assert first != second
+
+
+def test_deterministic_solver_uses_cache(task, monkeypatch):
+    monkeypatch.setattr(task.Task, "deterministic", True)
+    first = task.Task(params()).solve()
+    second = task.Task(params()).solve()
+    other = task.Task(params(a1=3.0)).solve()
+
+    assert len(task.calls) == 2
+    assert first == second != other
+
+
+def test_cache_hit_is_saved_to_history(task, monkeypatch):
+    # Каждый запрос — запуск пользователя: попадание в кэш тоже пишется в историю
+    monkeypatch.setattr(task.Task, "deterministic", True)
+    task.Task(params()).solve()
+    task.Task(params()).solve()
+
+    rows = history()
+    assert len(task.calls) == 1
+    assert [(row["A1"], row["RES1"]) for row in rows] == [(1.0, 1), (1.0, 1)]
+
+
+def test_save_false_skips_history(task):
+    task.Task(params()).solve(save=False)
+    assert history() == []
@@ -0,0 +1,20 @@
+import os
+
+from conftest import DASH_DIR, load_module
+
+import history_store
+import metrics
+
+
+def test_import_has_no_ingest_side_effect(monkeypatch):
+    calls = []
+    monkeypatch.setattr(history_store, "ingest_pending", lambda base_dir: calls.append(base_dir) or [])
+    load_module("dash_app", os.path.join(DASH_DIR, "app.py"))
+    assert calls == []
+
+
+def test_history_cache_hits_are_counters(dash_app):
+    text = metrics.render()
+    assert "# TYPE nir_history_cache_hits_total counter" in text
+    assert "# TYPE nir_history_cache_misses_total counter" in text
+    assert "# TYPE nir_history_cache_rows gauge" in text
@@ -0,0 +1,41 @@
+import json
+import types
+
+import pandas as pd
+import pytest
+
+import task
+from event_log import events_path
+
+PARAMS = {"m": 2.0, "g": 9.8, "h": 10.0, "V": 3.0, "T": 25.0, "SPECIFIC_HEAT": 1.0}
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(task, "time", types.SimpleNamespace(perf_counter=task.time.perf_counter,
+                                                           sleep=lambda seconds: None))
+
+
+def event_types(folder):
+    with open(events_path(folder), encoding="utf-8") as f:
+        return [json.loads(line)["type"] for line in f]
+
+
+def test_task_solve_twice_with_own_log():
+    series = task.Task(PARAMS, "own", 0)
+    series.solve()
+    assert series.events is None
+    series.solve()
+
+    kinds = event_types("own")
+    assert kinds.count("series_start") == kinds.count("series_finish") == 2
+    assert kinds.index("step") < kinds.index("series_finish")
+
+
+def test_batch_solve_twice_with_own_log():
+    batch = task.BatchTask(pd.DataFrame([PARAMS, PARAMS]), "batch")
+    batch.solve()
+    assert batch.events is None
+    batch.solve()
+
+    assert event_types("batch") == ["series_done", "run_summary"] * 2
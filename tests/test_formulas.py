@@ -0,0 +1,25 @@
+import os
+
+import pytest
+import yaml
+
+from conftest import DASH_DIR
+
+from formulas import Model, load_model, order_outputs
+
+
+def test_shipped_config_keeps_yaml_order():
+    with open(os.path.join(DASH_DIR, "param_config.yaml"), encoding="utf-8") as f:
+        model = load_model(yaml.safe_load(f))
+    assert model.outputs == ["E_pot", "E_kin", "E_total", "Q"]
+    assert model.order == ["E_pot", "E_kin", "E_total", "Q"]
+
+
+def test_dependency_moves_only_as_far_as_needed():
+    deps = {"b": {"a"}, "a": set(), "c": set(), "d": {"b"}}
+    assert order_outputs(deps) == ["a", "b", "c", "d"]
+
+
+def test_cycle_is_reported():
+    with pytest.raises(ValueError, match="Циклическая зависимость"):
+        Model(["x"], {"a": "b + x", "b": "a"})
@@ -0,0 +1,48 @@
+import subprocess
+import sys
+
+from conftest import DASH_DIR
+
+from results_writer import ResultsWriter
+
+COLUMNS = ["series", "x"]
+
+# Процесс пишет строки и падает посреди блока: os._exit не сбрасывает буферы и не закрывает файл
+CRASH = """
+import os, sys
+sys.path.insert(0, {dash!r})
+from results_writer import ResultsWriter
+writer = ResultsWriter("results.csv", ["series", "x"]{extra})
+for i in range(1, 6):
+    writer.write_row({{"series": i, "x": i * 10}})
+os._exit(1)
+"""
+
+
+def crash(extra=""):
+    code = CRASH.format(dash=DASH_DIR, extra=extra)
+    assert subprocess.run([sys.executable, "-c", code]).returncode == 1
+    with open("results.csv", encoding="utf-8") as f:
+        return f.read().splitlines()
+
+
+def test_crash_mid_batch_keeps_finished_rows():
+    lines = crash()
+    assert lines == ["series,x", "1,10", "2,20", "3,30", "4,40", "5,50"]
+
+
+def test_opt_in_batching_loses_only_unflushed_rows():
+    lines = crash(", batch_size=2")
+    assert lines == ["series,x", "1,10", "2,20", "3,30", "4,40"]
+
+
+def test_reopen_cuts_torn_last_row():
+    with ResultsWriter("results.csv", COLUMNS) as writer:
+        writer.write_row({"series": 1, "x": 10})
+    with open("results.csv", "a", encoding="utf-8") as f:
+        f.write("2,2")
+
+    with ResultsWriter("results.csv", COLUMNS) as writer:
+        writer.write_row({"series": 2, "x": 20})
+    with open("results.csv", encoding="utf-8") as f:
+        assert f.read().splitlines() == ["series,x", "1,10", "2,20"]
@@ -0,0 +1,53 @@
+import pytest
+
+from sweep import DEFAULT_LEVELS, sweep_chunks
+
+CONFIG = {
+    "parameters": {
+        "m": {"min": 0, "max": 1, "step": 0.5},
+        "h": {"min": 10, "max": 40, "step": 10},
+    },
+    "constants": {"g": {"value": 9.81}},
+}
+
+
+def test_grid_without_levels_follows_slider_steps():
+    total, chunks = sweep_chunks(CONFIG, "grid", chunk_size=100)
+    df = next(chunks)
+    assert total == 3 * 4
+    assert sorted(set(df["m"])) == [0.0, 0.5, 1.0]
+    assert list(df["h"][:4]) == [10.0, 20.0, 30.0, 40.0]
+
+
+def test_grid_with_levels_is_even():
+    total, chunks = sweep_chunks(CONFIG, "grid", chunk_size=100, levels=5)
+    df = next(chunks)
+    assert total == 25
+    assert sorted(set(df["h"])) == [10.0, 17.5, 25.0, 32.5, 40.0]
+    assert set(df["g"]) == {9.81}
+
+
+@pytest.fixture
+def sweep_started(dash_app, monkeypatch):
+    """run_sweep без запуска расчёта: возвращает source, с которым ставится запуск."""
+    started = []
+    monkeypatch.setattr(dash_app, "start_run", lambda sid, chunks, total, settings, source, **kw:
+                        started.append((total, source)) or "run")
+    monkeypatch.setattr(dash_app, "run_status_text", lambda folder: "")
+    dash_app.scheduler.session("s").config = CONFIG
+
+    def run(levels):
+        message = dash_app.run_sweep(1, "grid", None, levels, 1, "inline", 1, [], 0, "s")[-1]
+        assert started, message
+        return started.pop()
+    return run
+
+
+def test_app_empty_levels_use_slider_steps(sweep_started):
+    total, source = sweep_started(None)
+    assert total == 12 and source["levels"] is None
+
+
+def test_app_levels_are_passed_through(sweep_started):
+    total, source = sweep_started(DEFAULT_LEVELS)
+    assert total == DEFAULT_LEVELS ** 2 and source["levels"] == DEFAULT_LEVELS